@@ -0,0 +1,102 @@
+import os
+from typing import Optional
+
+from fastapi import Header
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import config
+from app.database.config import DATABASE_REPLICA_URLS, DATABASE_URL, engine_options
+from app.database.replicas import ReplicaSet
+from app.services.metrics import instrument_engine
+
+# Serve the read-heavy routes from async handlers on an async engine (aiomysql / aiosqlite)
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in `url` for its async counterpart, e.g. mysql+pymysql -> mysql+aiomysql."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()!r}")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_async_replicas: Optional[ReplicaSet] = None
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    async_engine = create_async_engine(url, **engine_options(url, is_async=True))
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """Created on first use so the async drivers are only required when async mode is on."""
+    global _async_engine, _async_session_factory, _async_replicas
+    if _async_engine is None:
+        _async_engine = _create_async_engine(os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL))
+        _async_session_factory = async_sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+        # The same replicas as the sync read routes, through the async driver
+        if DATABASE_REPLICA_URLS:
+            _async_replicas = ReplicaSet([_create_async_engine(to_async_url(url)) for url in DATABASE_REPLICA_URLS])
+    return _async_engine
+
+
+async def get_async_session():
+    get_async_engine()
+    async with _async_session_factory() as session:
+        yield session
+
+
+async def get_async_read_session(x_user_id: Optional[str] = Header(None, alias="X-User-ID")):
+    """
+    `get_read_session` for the async routers: the next healthy replica, or the primary when no
+    replicas are configured, none answers, or the caller wrote recently (read-your-writes).
+    """
+    get_async_engine()
+    connection = None
+    if _async_replicas is not None and not config.recent_writers.wrote_recently(x_user_id):
+        connection = await _async_replicas.connect_async()
+    if connection is None:
+        async with _async_session_factory() as session:
+            yield session
+        return
+    # Already started, so it is closed explicitly rather than entered with `async with`
+    try:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await connection.close()
+
+
+def peek_async_engine() -> Optional[AsyncEngine]:
+    """The async engine if async mode has created it, without creating it."""
+    return _async_engine
+
+
+def peek_async_replicas() -> Optional[ReplicaSet]:
+    """The async replicas if async mode has created them, without creating them."""
+    return _async_replicas
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory, _async_replicas
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+    if _async_replicas is not None:
+        for replica_engine in _async_replicas.engines:
+            await replica_engine.dispose()
+        _async_replicas = None
@@ -1,4 +1,10 @@
+from fastapi import Header, Request
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy.engine import Connection, Engine, make_url
+from typing import Optional
+from app.database.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from app.database.replicas import RecentWriters, ReplicaSet
+from app.services.metrics import instrument_engine
 import os
 
 # Prefer DATABASE_URL from environment (docker-compose sets this)
@@ -10,16 +16,97 @@ if not DATABASE_URL:
     load_dotenv()
     DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
 
-def get_session():
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return default if value is None else value.lower() in ("1", "true", "yes")
+
+
+# Logging every statement costs more than the queries themselves under load; opt in for debugging
+DB_ECHO = env_flag("DB_ECHO", False)
+
+# Defaults keep pool_size + max_overflow above Starlette's 40 worker threads, recycle well
+# inside MySQL's wait_timeout, and pre-ping so connections dropped by the server are replaced.
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "30")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": env_flag("DB_POOL_PRE_PING", True),
+}
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Keyword arguments for create_engine/create_async_engine; in-memory SQLite keeps its own pool."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {"echo": DB_ECHO}
+    poolclass = InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool
+    return {"echo": DB_ECHO, "poolclass": poolclass, **POOL_OPTIONS}
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(engine)
+
+# Optional comma-separated read replicas; read-only routes use them through get_read_session
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+replica_engines = [create_engine(url, **engine_options(url)) for url in DATABASE_REPLICA_URLS]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+replicas = ReplicaSet(replica_engines) if replica_engines else None
+recent_writers = RecentWriters()
+
+# Requests that may write; their caller's reads are pinned to the primary for a while afterwards
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+def get_session(request: Request):
+    """Session on the primary, for writes and for reads that must not lag."""
     with Session(engine) as session:
         yield session
+    if replicas is not None and request.method in WRITE_METHODS:
+        recent_writers.note(request.headers.get("X-User-ID"))
+
+def _read_connection(caller_id: Optional[str]) -> Optional[Connection]:
+    """A connection to the next healthy replica, or None when reads should go to the primary."""
+    if replicas is None or recent_writers.wrote_recently(caller_id):
+        return None
+    return replicas.connect()
+
+def get_read_session(x_user_id: Optional[str] = Header(None, alias="X-User-ID")):
+    """
+    Session for read-only routes: the next healthy replica, or the primary when no replicas are
+    configured, none answers, or the caller wrote recently (read-your-writes).
+    """
+    connection = _read_connection(x_user_id)
+    if connection is None:
+        with Session(engine) as session:
+            yield session
+        return
+    with connection, Session(bind=connection) as session:
+        yield session
+
+def get_read_engine(x_user_id: Optional[str] = Header(None, alias="X-User-ID")) -> Engine:
+    """
+    The engine get_read_session would read from, for streaming responses: their body runs after
+    dependency cleanup, so they open (and close) a Session of their own inside it.
+    """
+    connection = _read_connection(x_user_id)
+    if connection is None:
+        return engine
+    with connection:
+        return connection.engine
 
 def create_db_and_tables():
     from app.models.user import User
     from app.models.ticket import Ticket
+    from app.models.ticket_archive import TicketArchive
+    from app.models.ticket_audit import TicketAuditEvent
+    from app.models.ticket_counter import TicketCounter
+    from app.database.migrations import upgrade
+    from app.services.counters import ensure_counters
     SQLModel.metadata.create_all(engine)
+    upgrade(engine)
+    ensure_counters(engine)
 '''
 from sqlmodel import SQLModel, create_engine, Session
 from dotenv import load_dotenv
@@ -0,0 +1,89 @@
+from typing import Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DDL, Float, event, inspect, literal, or_, text, type_coerce
+from sqlalchemy import column as sql_column, func, table as sql_table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+MYSQL_FULLTEXT_INDEX = "ft_ticket_subject_description"
+SQLITE_FTS_TABLE = "ticket_fts"
+
+MYSQL_DDL = f"ALTER TABLE ticket ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (subject, description)"
+
+# External-content FTS5 index over ticket, kept in sync by triggers on insert, delete and
+# edits to subject/description (status transitions do not touch the index).
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} "
+    "USING fts5(subject, description, content='ticket', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS ticket_fts_ai AFTER INSERT ON ticket BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, subject, description) VALUES (new.id, new.subject, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS ticket_fts_ad AFTER DELETE ON ticket BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, subject, description) "
+    "VALUES ('delete', old.id, old.subject, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS ticket_fts_au AFTER UPDATE OF subject, description ON ticket BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, subject, description) "
+    "VALUES ('delete', old.id, old.subject, old.description); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, subject, description) VALUES (new.id, new.subject, new.description); END",
+]
+
+
+def register_fulltext(ticket_table):
+    """Create/drop the full-text index together with the ticket table (create_all / drop_all)."""
+    event.listen(ticket_table, "after_create", DDL(MYSQL_DDL).execute_if(dialect="mysql"))
+    for statement in SQLITE_DDL:
+        event.listen(ticket_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(ticket_table, "before_drop", DDL(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}").execute_if(dialect="sqlite"))
+
+
+def ensure_fulltext(engine: Engine):
+    """Add the full-text index to a database whose ticket table predates it."""
+    inspector = inspect(engine)
+    if not inspector.has_table("ticket"):
+        return
+    with engine.begin() as conn:
+        if engine.dialect.name == "mysql":
+            if MYSQL_FULLTEXT_INDEX not in {ix["name"] for ix in inspector.get_indexes("ticket")}:
+                conn.exec_driver_sql(MYSQL_DDL)
+        elif engine.dialect.name == "sqlite" and not inspector.has_table(SQLITE_FTS_TABLE):
+            for statement in SQLITE_DDL:
+                conn.exec_driver_sql(statement)
+            conn.exec_driver_sql(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _fts5_query(q: str) -> str:
+    """Quote each term so user input is matched literally rather than parsed as FTS5 syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def ticket_search_query(dialect_name: str, q: str) -> Tuple[object, object]:
+    """
+    Select ticket columns plus a relevance `rank` (higher is better) for tickets matching `q`.
+    Returns (statement, rank column).
+    """
+    from app.models.ticket import Ticket
+
+    if not q.split():
+        raise HTTPException(status_code=400, detail="Search query must contain at least one term")
+
+    if dialect_name == "mysql":
+        score = type_coerce(match(Ticket.subject, Ticket.description, against=q).in_natural_language_mode(), Float)
+        rank = score.label("rank")
+        statement = select(*Ticket.__table__.c, rank).where(score > 0)
+    elif dialect_name == "sqlite":
+        fts = sql_table(SQLITE_FTS_TABLE, sql_column("rowid"))
+        # bm25() is lower-is-better; negate it so both backends rank descending
+        rank = (-func.bm25(text(SQLITE_FTS_TABLE), type_=Float)).label("rank")
+        statement = (
+            select(*Ticket.__table__.c, rank)
+            .join_from(Ticket, fts, fts.c.rowid == Ticket.id)
+            .where(text(f"{SQLITE_FTS_TABLE} MATCH :fts_query").bindparams(fts_query=_fts5_query(q)))
+        )
+    else:
+        rank = literal(0.0, Float).label("rank")
+        pattern = f"%{q}%"
+        statement = select(*Ticket.__table__.c, rank).where(
+            or_(Ticket.subject.ilike(pattern), Ticket.description.ilike(pattern))
+        )
+    return statement, rank
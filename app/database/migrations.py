@@ -0,0 +1,122 @@
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel
+
+from app.database.fulltext import SQLITE_DDL, ensure_fulltext
+
+# Indexes a model no longer declares because a newer one covers them, by table
+SUPERSEDED_INDEXES = {
+    "ticket": [
+        "ix_ticket_updated_at",  # by ix_ticket_updated_at_id
+        "ix_ticket_team_status",  # by ix_ticket_team_status_priority
+    ],
+}
+
+
+def ensure_indexes(engine: Engine):
+    """
+    Create indexes declared on the models that an existing database is missing.
+    create_all() only creates indexes together with new tables, so databases created
+    before an index was added to a model need this to catch up.
+    """
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+
+
+def drop_superseded_indexes(engine: Engine):
+    """Drop SUPERSEDED_INDEXES from existing databases, once ensure_indexes has created their replacements."""
+    inspector = inspect(engine)
+    for table_name, names in SUPERSEDED_INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table_name)}
+        if existing.isdisjoint(names):
+            continue
+        # Drop through a reflected copy so the model's own Table never sees these indexes
+        reflected = Table(table_name, MetaData(), autoload_with=engine)
+        for index in reflected.indexes:
+            if index.name in names:
+                index.drop(engine)
+
+
+def ensure_precise_timestamps(engine: Engine):
+    """Widen ticket.updated_at to DATETIME(6) on MySQL databases created before it was declared so."""
+    if engine.dialect.name != "mysql":
+        return
+    inspector = inspect(engine)
+    if not inspector.has_table("ticket"):
+        return
+    column = next(c for c in inspector.get_columns("ticket") if c["name"] == "updated_at")
+    if getattr(column["type"], "fsp", None) != 6:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE ticket MODIFY updated_at DATETIME(6) NOT NULL"))
+
+
+def ensure_sqlite_autoincrement(engine: Engine):
+    """
+    Rebuild a SQLite ticket table created without AUTOINCREMENT, which reuses the ids of the
+    newest rows once they are deleted (i.e. archived). SQLite cannot alter a table in place.
+    """
+    if engine.dialect.name != "sqlite" or not inspect(engine).has_table("ticket"):
+        return
+    from app.models.ticket import Ticket
+
+    with engine.begin() as connection:
+        ddl = connection.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'ticket'").scalar()
+        if "AUTOINCREMENT" in ddl.upper():
+            return
+        rebuilt = Ticket.__table__.to_metadata(MetaData(), name="ticket_rebuild")
+        connection.execute(CreateTable(rebuilt))
+        connection.exec_driver_sql("INSERT INTO ticket_rebuild SELECT * FROM ticket")
+        # Takes the indexes and full-text triggers with it; the FTS table keeps its rowids
+        connection.exec_driver_sql("DROP TABLE ticket")
+        connection.exec_driver_sql("ALTER TABLE ticket_rebuild RENAME TO ticket")
+        for index in Ticket.__table__.indexes:
+            index.create(connection)
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def ensure_ticket_ids_above_archive(engine: Engine):
+    """
+    Move the ticket auto-increment counter past every archived id. Archival keeps the newest
+    ticket live so this normally holds already; it repairs databases archived before that rule.
+    """
+    inspector = inspect(engine)
+    if not (inspector.has_table("ticket") and inspector.has_table("ticket_archive")):
+        return
+    with engine.begin() as connection:
+        archived = connection.exec_driver_sql("SELECT MAX(id) FROM ticket_archive").scalar()
+        live = connection.exec_driver_sql("SELECT MAX(id) FROM ticket").scalar()
+        if archived is None or (live is not None and live > archived):
+            return
+        if engine.dialect.name == "mysql":
+            connection.exec_driver_sql(f"ALTER TABLE ticket AUTO_INCREMENT = {int(archived) + 1}")
+        elif engine.dialect.name == "sqlite":
+            updated = connection.exec_driver_sql(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'ticket'", (archived,)
+            )
+            if updated.rowcount == 0:
+                connection.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('ticket', ?)", (archived,))
+
+
+def upgrade(engine: Engine):
+    """Bring an existing schema up to date with the models. Safe to run repeatedly."""
+    ensure_precise_timestamps(engine)
+    ensure_sqlite_autoincrement(engine)
+    ensure_ticket_ids_above_archive(engine)
+    ensure_indexes(engine)
+    drop_superseded_indexes(engine)
+    ensure_fulltext(engine)
+
+
+if __name__ == "__main__":
+    from app.database.config import create_db_and_tables
+    create_db_and_tables()
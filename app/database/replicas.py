@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Union
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.database.pool import pool_status
+
+logger = logging.getLogger("app.replicas")
+
+# A replica that fails to connect is left out of the rotation this long before it is tried again
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+# Reads by a caller who wrote this recently go to the primary, so they see their own changes; 0 turns it off
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas. Connecting is the health check: checkout pings the
+    connection (pool_pre_ping), and a replica that fails is skipped for `retry_seconds`,
+    after which the next read probes it again. Holds sync engines (`connect`) or async
+    engines (`connect_async`), not a mix.
+    """
+
+    def __init__(self, engines: List[Union[Engine, AsyncEngine]], retry_seconds: float = REPLICA_RETRY_SECONDS):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until = [0.0] * len(engines)
+        self._failures = [0] * len(engines)
+
+    def connect(self) -> Optional[Connection]:
+        """A connection to the next healthy replica, or None when none of them answers."""
+        for index in self._rotation():
+            try:
+                connection = self.engines[index].connect()
+            except exc.DBAPIError as e:
+                self._mark_down(index, e)
+                continue
+            self._down_until[index] = 0.0
+            return connection
+        return None
+
+    async def connect_async(self) -> Optional[AsyncConnection]:
+        """`connect` for async engines."""
+        for index in self._rotation():
+            try:
+                connection = await self.engines[index].connect()
+            except exc.DBAPIError as e:
+                self._mark_down(index, e)
+                continue
+            self._down_until[index] = 0.0
+            return connection
+        return None
+
+    def _rotation(self) -> Iterator[int]:
+        """Indexes of the replicas to try, in turn, starting one further along on every call."""
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.engines)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._down_until[index] <= time.monotonic():
+                yield index
+
+    def _mark_down(self, index: int, error: exc.DBAPIError):
+        logger.warning("Replica %s is unavailable: %s", self._name(index), error.orig)
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_seconds
+            self._failures[index] += 1
+
+    def _name(self, index: int) -> str:
+        return self.engines[index].url.render_as_string(hide_password=True)
+
+    def status(self) -> List[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": self._name(index),
+                    "healthy": self._down_until[index] <= now,
+                    "failures": self._failures[index],
+                    **pool_status(engine.pool),
+                }
+                for index, engine in enumerate(self.engines)
+            ]
+
+
+class RecentWriters:
+    """Callers who wrote within the last `window` seconds (bounded, oldest forgotten first)."""
+
+    def __init__(self, window: float = READ_YOUR_WRITES_SECONDS, maxsize: int = 10_000):
+        self.window = window
+        self.maxsize = maxsize
+        self._until: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def note(self, caller_id: Optional[str]):
+        if not self.window or caller_id is None:
+            return
+        with self._lock:
+            self._until[caller_id] = time.monotonic() + self.window
+            self._until.move_to_end(caller_id)
+            while len(self._until) > self.maxsize:
+                self._until.popitem(last=False)
+
+    def wrote_recently(self, caller_id: Optional[str]) -> bool:
+        if caller_id is None:
+            return False
+        with self._lock:
+            until = self._until.get(caller_id)
+            if until is not None and until <= time.monotonic():
+                del self._until[caller_id]
+                until = None
+            return until is not None
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
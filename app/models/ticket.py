@@ -1,7 +1,10 @@
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from sqlalchemy import DateTime, Index
+from sqlalchemy.dialects import mysql
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
+from app.database.fulltext import register_fulltext
 
 class TicketStatus(str, Enum):
     new = "new"
@@ -16,11 +19,29 @@ class TicketPriority(str, Enum):
     medium = "medium"
     low = "low"
 
+# MySQL DATETIME defaults to whole seconds; updated_at versions tickets (ETags, If-Match)
+PRECISE_DATETIME = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
 class TicketBase(SQLModel):
     subject: str
     description: Optional[str] = None
 
 class Ticket(TicketBase, table=True):
+    # Secondary indexes carry the primary key implicitly (InnoDB and SQLite alike),
+    # so keyset pages ordered by id stay index-only range scans.
+    __table_args__ = (
+        Index("ix_ticket_reporter_id", "reporter_id"),
+        Index("ix_ticket_status", "status"),
+        Index("ix_ticket_assignee_status", "assignee_id", "status"),
+        # Also the claim-next queue: a team's triaged tickets in (priority, created_at) order
+        Index("ix_ticket_team_status_priority", "assigned_team", "status", "priority", "created_at"),
+        Index("ix_ticket_created_at", "created_at"),
+        # Spelled out as (updated_at, id): the change feed seeks on both
+        Index("ix_ticket_updated_at_id", "updated_at", "id"),
+        # Never hand out an id again, even once its ticket has moved to ticket_archive
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     reporter_id: int 
     assignee_id: Optional[int] = None
@@ -29,9 +50,11 @@ class Ticket(TicketBase, table=True):
     assigned_team: Optional[str] = None
     resolution_notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_type=PRECISE_DATETIME)
     resolved_at: Optional[datetime] = None
 
+register_fulltext(Ticket.__table__)
+
 class TicketCreate(TicketBase):
     pass
 
@@ -45,13 +68,55 @@ class TicketRead(TicketBase):
     created_at: datetime
     updated_at: datetime
 
+class TicketBulkItemError(SQLModel):
+    index: int
+    detail: str
+
+class TicketBulkCreateResult(SQLModel):
+    created_ids: List[int]
+    errors: List[TicketBulkItemError]
+
+class TicketSearchResult(TicketRead):
+    rank: float
+
+class TicketDurationStats(SQLModel):
+    count: int
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+
+class TicketDurationBreakdown(SQLModel):
+    overall: TicketDurationStats
+    priority: Dict[str, TicketDurationStats]
+    assigned_team: Dict[str, TicketDurationStats]
+    assignee_id: Dict[str, TicketDurationStats]
+
+class TicketSlaReport(SQLModel):
+    generated_at: datetime
+    resolution_seconds: TicketDurationBreakdown
+    backlog_age_seconds: TicketDurationBreakdown
+
 class TicketTriageUpdate(SQLModel):
     priority: TicketPriority
     assigned_team: str
     assignee_id: Optional[int] = None
+    # Assign the least loaded agent of assigned_team instead of assignee_id
+    auto_assign: bool = False
+
+class TicketBulkTriageItem(TicketTriageUpdate):
+    ticket_id: int
+
+class TicketBulkTriageOutcome(SQLModel):
+    ticket_id: int
+    success: bool
+    detail: Optional[str] = None
+    # The agent picked for an auto_assign item
+    assignee_id: Optional[int] = None
 
 class TicketAssignUpdate(SQLModel):
-    assignee_id: int
+    # Exactly one of the two: a given agent, or the least loaded agent of the caller's department
+    assignee_id: Optional[int] = None
+    auto_assign: bool = False
 
 class TicketResolveUpdate(SQLModel):
     resolution_notes: str
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlmodel import Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+from app.models.ticket import PRECISE_DATETIME, TicketBase, TicketPriority, TicketStatus
+
+class TicketArchive(TicketBase, table=True):
+    """Closed tickets moved out of `ticket` by app.services.archival, keeping their ids."""
+    __tablename__ = "ticket_archive"
+    # Only what reads of archived tickets need: detail by id, the reporter's own list, and
+    # GET /tickets?include_archived=true keyset-paged by created_at or updated_at
+    __table_args__ = (
+        Index("ix_ticket_archive_reporter_id", "reporter_id"),
+        Index("ix_ticket_archive_created_at_id", "created_at", "id"),
+        Index("ix_ticket_archive_updated_at_id", "updated_at", "id"),
+    )
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    reporter_id: int
+    assignee_id: Optional[int] = None
+    status: TicketStatus = TicketStatus.closed
+    priority: Optional[TicketPriority] = None
+    assigned_team: Optional[str] = None
+    resolution_notes: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime = Field(sa_type=PRECISE_DATETIME)
+    resolved_at: Optional[datetime] = None
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,29 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+from app.models.ticket import PRECISE_DATETIME, TicketPriority, TicketStatus
+
+class TicketAuditEventBase(SQLModel):
+    """One committed ticket change: who did what, and the ticket's routing fields after it."""
+    ticket_id: int
+    event: str
+    actor_id: int
+    status: TicketStatus
+    priority: Optional[TicketPriority] = None
+    assigned_team: Optional[str] = None
+    assignee_id: Optional[int] = None
+    created_at: datetime = Field(sa_type=PRECISE_DATETIME)
+
+class TicketAuditEvent(TicketAuditEventBase, table=True):
+    """Written behind the request by app.services.audit_log; never updated."""
+    __tablename__ = "ticket_events"
+    # A ticket's history in insertion order, as GET /tickets/{id}/history pages it
+    __table_args__ = (
+        Index("ix_ticket_events_ticket_id_id", "ticket_id", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+class TicketAuditEventRead(TicketAuditEventBase):
+    id: int
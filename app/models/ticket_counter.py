@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, String
+
+class TicketCounter(SQLModel, table=True):
+    """Number of live tickets per (dimension, bucket), e.g. ("status", "new") -> 12."""
+    __tablename__ = "ticket_counter"
+
+    dimension: str = Field(sa_column=Column(String(32), primary_key=True))
+    bucket: str = Field(sa_column=Column(String(255), primary_key=True))
+    count: int = 0
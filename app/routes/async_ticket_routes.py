@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+from app.database.async_config import get_async_read_session
+from app.models.ticket import Ticket, TicketRead
+from app.models.user import UserRole
+from app.routes.conditional import ETAG_HEADER, is_not_modified, not_modified, ticket_etag
+from app.routes.pagination import PageParams, json_object, page_params, paginate_async
+from app.routes.ticket_queries import (
+    TicketFilters, all_tickets_query, can_view_ticket, my_tickets_query, pending_triage_query, ticket_by_id_query,
+    ticket_fields, ticket_filters, ticket_models,
+)
+from app.services.identity import Caller, get_caller_async
+
+# Async versions of the read-only ticket routes. Mounted ahead of the sync router when
+# DATABASE_ASYNC is enabled; writes keep going through app/routes/ticket_routes.py.
+# Path parameters use the :int convertor so these never shadow sync routes like /tickets/export.
+router = APIRouter(prefix="/tickets", tags=["Tickets"])
+
+@router.get("/my", response_model=List[TicketRead])
+async def get_my_tickets(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    include_archived: bool = Query(False, description="Also list tickets moved to the archive"),
+    session: AsyncSession = Depends(get_async_read_session),
+    user: Optional[Caller] = Depends(get_caller_async)
+):
+    if not user or user.role != "employee":
+        raise HTTPException(status_code=403, detail="Only employees can view their tickets.")
+
+    statements = [my_tickets_query(user.id, model) for model in ticket_models(include_archived)]
+    return await paginate_async(session, statements, page, response, key_columns=[Ticket.id], fields=fields)
+
+@router.get("/pending-triage", response_model=List[TicketRead])
+async def get_pending_tickets_for_triage(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    session: AsyncSession = Depends(get_async_read_session),
+    user: Optional[Caller] = Depends(get_caller_async)
+):
+    if not user or user.role != UserRole.triage_officer:
+        raise HTTPException(status_code=403, detail="Only triage officers can access this")
+
+    return await paginate_async(session, pending_triage_query(), page, response, key_columns=[Ticket.id], fields=fields)
+
+@router.get("/", response_model=List[TicketRead])
+async def get_all_tickets(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    filters: TicketFilters = Depends(ticket_filters),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    include_archived: bool = Query(False, description="Also list tickets moved to the archive"),
+    user: Optional[Caller] = Depends(get_caller_async),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    statements = [all_tickets_query(filters, model) for model in ticket_models(include_archived)]
+    return await paginate_async(
+        session, statements, page, response,
+        key_columns=filters.key_columns, descending=filters.descending, fields=fields,
+    )
+
+@router.get("/{ticket_id:int}", response_model=TicketRead)
+async def get_ticket_by_id(
+    ticket_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    user: Optional[Caller] = Depends(get_caller_async),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Falls back to the archive, like the sync route
+    ticket = (await session.exec(ticket_by_id_query(ticket_id, fields))).first()
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    if not can_view_ticket(user, ticket):
+        raise HTTPException(status_code=403, detail="Not authorized to view this ticket")
+
+    etag = ticket_etag(ticket.id, ticket.updated_at)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    return json_object(ticket, response, fields)
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+from app.database.async_config import get_async_read_session
+from app.models.user import User, UserRead
+from app.routes.conditional import ETAG_HEADER, is_not_modified, not_modified, user_etag
+from app.routes.pagination import PageParams, json_object, page_params, paginate_async
+from app.routes.sparse_fields import select_fields
+from app.routes.user_routes import USER_READ_COLUMNS, user_fields
+from app.services.identity import Caller, get_caller_async
+
+# Async versions of the read-only user routes; see async_ticket_routes.py.
+router = APIRouter(prefix="/users", tags=["Users"])
+
+@router.get("/", response_model=list[UserRead])
+async def get_users(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(user_fields),
+    user: Optional[Caller] = Depends(get_caller_async),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if user.role not in ["triage_officer", "agent"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await paginate_async(session, select(*USER_READ_COLUMNS), page, response, key_columns=[User.id], fields=fields)
+
+@router.get("/{user_id:int}", response_model=UserRead)
+async def get_user(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[List[str]] = Depends(user_fields),
+    requesting_user: Optional[Caller] = Depends(get_caller_async),
+    session: AsyncSession = Depends(get_async_read_session)
+):
+    if not requesting_user:
+        raise HTTPException(status_code=404, detail="Requesting user not found")
+
+    # Employees can only see their own record
+    if requesting_user.role == "employee" and requesting_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    if fields is None:
+        target_user = await session.get(User, user_id)
+    else:
+        target_user = (await session.exec(select_fields(select(*USER_READ_COLUMNS), fields).where(User.id == user_id))).first()
+    if not target_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    etag = user_etag(target_user, fields)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    return target_user if fields is None else json_object(target_user, response, fields)
@@ -0,0 +1,81 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Header, Response
+from sqlalchemy import false
+
+from app.models.ticket import Ticket
+from app.models.user import UserRead, UserRole
+from app.services.ticket_lifecycle import FailureCheck
+
+ETAG_HEADER = "ETag"
+# updated_at as it appears inside a ticket ETag
+VERSION_FORMAT = "%Y%m%d%H%M%S%f"
+
+
+def ticket_etag(ticket_id: int, updated_at: datetime) -> str:
+    """Strong ETag for one version of a ticket. `TicketPrecondition` decodes it back to updated_at."""
+    return f'"{ticket_id}-{updated_at.strftime(VERSION_FORMAT)}"'
+
+
+def content_etag(*values) -> str:
+    """ETag for rows without a version column: a digest of the values the response shows."""
+    return '"' + hashlib.blake2b(repr(values).encode(), digest_size=8).hexdigest() + '"'
+
+
+def user_etag(user, fields: Optional[List[str]] = None) -> str:
+    """Users carry no updated_at, so the ETag is a digest of every field returned (all of UserRead by default)."""
+    values = {name: getattr(user, name) for name in fields or UserRead.model_fields}
+    if "role" in values:
+        values["role"] = UserRole(values["role"]).value
+    return content_etag(*values.items())
+
+
+def _entity_tags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header already names `etag` (weak comparison, per RFC 9110)."""
+    if if_none_match is None:
+        return False
+    tags = [tag.removeprefix("W/") for tag in _entity_tags(if_none_match)]
+    return "*" in tags or etag in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={ETAG_HEADER: etag})
+
+
+@dataclass
+class TicketPrecondition:
+    """The If-Match header of a ticket PUT. `etags` is None when there is nothing to check."""
+    etags: Optional[List[str]] = None
+
+    def conditions(self, ticket_id: int) -> list:
+        """Extra `transition` conditions: the ticket is still at one of the versions the client named."""
+        if self.etags is None:
+            return []
+        prefix, versions = f'"{ticket_id}-', []
+        for tag in self.etags:
+            if tag.startswith(prefix) and tag.endswith('"'):
+                try:
+                    versions.append(datetime.strptime(tag[len(prefix):-1], VERSION_FORMAT))
+                except ValueError:
+                    pass
+        return [Ticket.updated_at.in_(versions)] if versions else [false()]
+
+    def check(self) -> FailureCheck:
+        """`raise_for_failed_transition` check reporting a version mismatch as 412."""
+        return (
+            lambda t: self.etags is not None and ticket_etag(t.id, t.updated_at) not in self.etags,
+            412, "Ticket was modified since it was read",
+        )
+
+
+def ticket_precondition(if_match: Optional[str] = Header(None)) -> TicketPrecondition:
+    tags = _entity_tags(if_match) if if_match is not None else []
+    # Absent, empty or "*" (the ticket exists, which the transition checks anyway): no version check
+    return TicketPrecondition(tags if tags and "*" not in tags else None)
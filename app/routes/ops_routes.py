@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from app.database.async_config import peek_async_engine, peek_async_replicas
+from app.database import config
+from app.database.config import env_flag
+from app.database.pool import pool_status
+from app.models.user import UserRole
+from app.services.audit_log import audit_log
+from app.services.identity import Caller, get_caller, identity_cache
+from app.services.metrics import registry
+from app.services.ticket_events import ticket_events
+
+# Serve /ops/* and /metrics without X-User-ID, e.g. to a Prometheus scraper on a private network
+OPS_ENDPOINTS_PUBLIC = env_flag("OPS_ENDPOINTS_PUBLIC", False)
+
+def require_staff(user: Optional[Caller] = Depends(get_caller)):
+    """Operational data (pools, replica URLs and health, traffic) is for agents and triage officers only."""
+    if not user or user.role not in [UserRole.agent, UserRole.triage_officer]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+router = APIRouter(tags=["Ops"], dependencies=[] if OPS_ENDPOINTS_PUBLIC else [Depends(require_staff)])
+
+@router.get("/ops/identity-cache")
+def get_identity_cache_stats():
+    return identity_cache.stats()
+
+@router.get("/ops/ticket-events")
+def get_ticket_event_stats():
+    return ticket_events.stats()
+
+@router.get("/ops/audit-log")
+def get_audit_log_stats():
+    return audit_log.stats()
+
+@router.get("/ops/pool")
+def get_pool_stats():
+    stats = {"primary": pool_status(config.engine.pool)}
+    if config.replicas is not None:
+        stats["replicas"] = config.replicas.status()
+    async_engine = peek_async_engine()
+    if async_engine is not None:
+        stats["async"] = pool_status(async_engine.pool)
+    async_replicas = peek_async_replicas()
+    if async_replicas is not None:
+        stats["async_replicas"] = async_replicas.status()
+    return stats
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
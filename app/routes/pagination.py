@@ -0,0 +1,170 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, or_, select, union_all
+from sqlmodel import Session, SQLModel
+
+from app.routes.sparse_fields import select_fields
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str]
+    limit: int
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, description=f"Page size (capped at {MAX_PAGE_SIZE})"),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> List[Any]:
+    """Decode a cursor into one value per key column, or raise 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v) if column.type.python_type is datetime else column.type.python_type(v)
+            for column, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(columns, values, descending: bool):
+    """WHERE clause selecting rows strictly after `values` in (col1, col2, ...) order."""
+    column, value = columns[0], values[0]
+    beyond = column < value if descending else column > value
+    if len(columns) == 1:
+        return beyond
+    return or_(beyond, and_(column == value, _after(columns[1:], values[1:], descending)))
+
+
+def page_statement(statement, page: PageParams, key_columns, descending: bool = False):
+    """Restrict `statement` to one keyset page (plus one look-ahead row) ordered by `key_columns`."""
+    if page.cursor is not None:
+        statement = statement.where(_after(key_columns, decode_cursor(page.cursor, key_columns), descending))
+    order = [c.desc() if descending else c.asc() for c in key_columns]
+    return statement.order_by(*order).limit(page.limit + 1)
+
+
+def union_page_statement(statements, page: PageParams, key_columns, descending: bool = False, fields=None):
+    """
+    One keyset page over the UNION ALL of `statements`, column selects with the same columns
+    (e.g. live and archived tickets; `key_columns` are matched in each by name). Every branch is
+    paged on its own indexes first, and the page is the head of their merged look-ahead rows.
+    Returns the statement and the key columns of its rows, for `finish_page`.
+    """
+    branches = []
+    for statement in statements:
+        statement = select_fields(statement, fields, key_columns)
+        keys = [statement.selected_columns[column.key] for column in key_columns]
+        branch = page_statement(statement, page, keys, descending).subquery()
+        branches.append(select(*branch.c))
+    merged = union_all(*branches).subquery()
+    keys = [merged.c[column.key] for column in key_columns]
+    return page_statement(select(*merged.c), PageParams(None, page.limit), keys, descending), keys
+
+
+def _page(statement, page: PageParams, key_columns, descending: bool, fields: Optional[List[str]]):
+    if isinstance(statement, list):
+        if len(statement) > 1:
+            return union_page_statement(statement, page, key_columns, descending, fields)
+        statement = statement[0]
+    return page_statement(select_fields(statement, fields, key_columns), page, key_columns, descending), key_columns
+
+
+def finish_page(rows, page: PageParams, response: Response, key_columns):
+    """Drop the look-ahead row and, if there was one, set the cursor for the next page."""
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, c.key) for c in key_columns])
+    return rows
+
+
+def read_columns(table, schema: type[SQLModel]) -> list:
+    """The columns of `table` that `schema` returns, in the schema's field order."""
+    return [table.c[name] for name in schema.model_fields if name in table.c]
+
+
+def _json_rows(rows, fields: Optional[List[str]]) -> List[dict]:
+    if fields is None:
+        return [row._asdict() for row in rows]
+    # Rows from `select_fields` lead with the requested fields; zip drops the trailing extras
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def json_page(rows, response: Response, fields: Optional[List[str]] = None) -> ORJSONResponse:
+    """
+    Encode column rows (see `read_columns`) with orjson, bypassing response_model validation.
+    orjson writes datetimes, enums and None exactly as pydantic does, so the JSON is unchanged.
+    """
+    return ORJSONResponse(_json_rows(rows, fields), headers=response.headers)
+
+
+def json_object(row, response: Response, fields: Optional[List[str]] = None) -> ORJSONResponse:
+    """`json_page` for a single row."""
+    return ORJSONResponse(_json_rows([row], fields)[0], headers=response.headers)
+
+
+def paginate(
+    session: Session, statement, page: PageParams, response: Response, key_columns,
+    descending: bool = False, fields: Optional[List[str]] = None,
+):
+    """
+    Run `statement`, a select of plain columns (see `read_columns`), as one keyset page ordered
+    by `key_columns` (last one must be unique) and answer it directly as JSON, limited to
+    `fields` if given. Sets the X-Next-Cursor header when more rows follow. A list of
+    statements is read as their union, see `union_page_statement`.
+    """
+    statement, key_columns = _page(statement, page, key_columns, descending, fields)
+    rows = session.execute(statement).all()
+    return json_page(finish_page(rows, page, response, key_columns), response, fields)
+
+
+def paginate_feed(
+    session: Session, statement, page: PageParams, response: Response, key_columns,
+    fields: Optional[List[str]] = None,
+):
+    """
+    `paginate` for a feed read in ascending key order and resumed later: X-Next-Cursor is set
+    after every non-empty page (echoing the given cursor otherwise), not only when more rows
+    follow. A page shorter than the limit means the reader has caught up.
+    """
+    statement = page_statement(select_fields(statement, fields, key_columns), page, key_columns)
+    rows = finish_page(session.execute(statement).all(), page, response, key_columns)
+    if rows:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], c.key) for c in key_columns])
+    elif page.cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.cursor
+    return json_page(rows, response, fields)
+
+
+async def paginate_async(
+    session, statement, page: PageParams, response: Response, key_columns,
+    descending: bool = False, fields: Optional[List[str]] = None,
+):
+    """`paginate` for an AsyncSession."""
+    statement, key_columns = _page(statement, page, key_columns, descending, fields)
+    rows = (await session.execute(statement)).all()
+    return json_page(finish_page(rows, page, response, key_columns), response, fields)
@@ -0,0 +1,36 @@
+from typing import Callable, List, Optional
+
+from fastapi import HTTPException, Query
+from sqlmodel import SQLModel
+
+
+def sparse_fields(schema: type[SQLModel]) -> Callable[..., Optional[List[str]]]:
+    """
+    Dependency for a `fields=` query parameter: a comma-separated subset of `schema`'s fields.
+    Resolves to the requested names in schema order, or None when the parameter is absent.
+    """
+    allowed = list(schema.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}"),
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(allowed))
+        if unknown or not requested:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested")
+        return [name for name in allowed if name in requested]
+
+    return dependency
+
+
+def select_fields(statement, fields: Optional[List[str]], required_columns=()):
+    """
+    Narrow a column select to `fields`, followed by any `required_columns` (cursor keys,
+    authorization inputs) the handler needs but the client did not ask for.
+    """
+    if fields is None:
+        return statement
+    names = list(dict.fromkeys([*fields, *(column.key for column in required_columns)]))
+    return statement.with_only_columns(*(statement.selected_columns[name] for name in names))
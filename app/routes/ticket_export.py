@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator
+
+from sqlmodel import Session
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _ndjson_chunk(keys, rows) -> str:
+    return "".join(json.dumps(dict(zip(keys, row)), default=_json_default) + "\n" for row in rows)
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+def stream_export(session: Session, statement, export_format: ExportFormat) -> Iterator[str]:
+    """
+    Yield the rows of `statement` encoded as NDJSON or CSV, one chunk per
+    EXPORT_CHUNK_SIZE rows. Rows come from a server-side cursor, so memory
+    stays bounded by the chunk size rather than the table size.
+    """
+    try:
+        result = session.execute(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        keys = list(result.keys())
+        if export_format == ExportFormat.csv:
+            yield _csv_chunk([keys])
+        for rows in result.partitions():
+            if export_format == ExportFormat.csv:
+                yield _csv_chunk(rows)
+            else:
+                yield _ndjson_chunk(keys, rows)
+        result.close()
+    finally:
+        # The body streams after the request's dependencies are cleaned up, so the
+        # export gets a session of its own; release it and its connection here.
+        session.close()
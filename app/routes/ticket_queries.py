@@ -0,0 +1,169 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import List, Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import union_all
+from sqlmodel import select
+
+from app.models.ticket import Ticket, TicketPriority, TicketRead, TicketSearchResult, TicketStatus
+from app.models.ticket_archive import TicketArchive
+from app.models.ticket_audit import TicketAuditEvent, TicketAuditEventRead
+from app.models.user import UserRole
+from app.routes.pagination import read_columns
+from app.routes.sparse_fields import select_fields, sparse_fields
+from app.services.identity import Caller
+
+
+class TicketSortField(str, Enum):
+    id = "id"
+    created_at = "created_at"
+    updated_at = "updated_at"
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+@dataclass
+class TicketFilters:
+    status: Optional[List[TicketStatus]] = None
+    priority: Optional[List[TicketPriority]] = None
+    assigned_team: Optional[str] = None
+    assignee_id: Optional[int] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    sort: TicketSortField = TicketSortField.id
+    order: SortOrder = SortOrder.asc
+
+    @property
+    def key_columns(self):
+        """Keyset columns for the requested sort; id breaks ties so the order is total."""
+        if self.sort == TicketSortField.id:
+            return [Ticket.id]
+        return [getattr(Ticket, self.sort.value), Ticket.id]
+
+    @property
+    def descending(self) -> bool:
+        return self.order == SortOrder.desc
+
+
+def ticket_filters(
+    status: Optional[List[TicketStatus]] = Query(None),
+    priority: Optional[List[TicketPriority]] = Query(None),
+    assigned_team: Optional[str] = Query(None),
+    assignee_id: Optional[int] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    updated_after: Optional[datetime] = Query(None),
+    updated_before: Optional[datetime] = Query(None),
+    sort: TicketSortField = Query(TicketSortField.id),
+    order: SortOrder = Query(SortOrder.asc),
+) -> TicketFilters:
+    for after, before in ((created_after, created_before), (updated_after, updated_before)):
+        if after and before and after >= before:
+            raise HTTPException(status_code=400, detail="Invalid date range: start must be before end")
+    return TicketFilters(
+        status=status, priority=priority, assigned_team=assigned_team, assignee_id=assignee_id,
+        created_after=created_after, created_before=created_before,
+        updated_after=updated_after, updated_before=updated_before,
+        sort=sort, order=order,
+    )
+
+
+# What the list endpoints select: exactly the TicketRead fields, see pagination.paginate
+TICKET_READ_COLUMNS = read_columns(Ticket.__table__, TicketRead)
+# What can_view_ticket and the ETag read, whatever `fields=` asks for
+TICKET_ACCESS_COLUMNS = [Ticket.id, Ticket.reporter_id, Ticket.assignee_id, Ticket.updated_at]
+# The same, for tickets moved to ticket_archive (see app/services/archival.py)
+READ_COLUMNS = {Ticket: TICKET_READ_COLUMNS, TicketArchive: read_columns(TicketArchive.__table__, TicketRead)}
+ACCESS_COLUMNS = {
+    Ticket: TICKET_ACCESS_COLUMNS,
+    TicketArchive: [TicketArchive.id, TicketArchive.reporter_id, TicketArchive.assignee_id, TicketArchive.updated_at],
+}
+# A ticket's audit log, oldest first; ix_ticket_events_ticket_id_id serves it
+HISTORY_READ_COLUMNS = read_columns(TicketAuditEvent.__table__, TicketAuditEventRead)
+HISTORY_KEY = [TicketAuditEvent.id]
+
+# Change feed order; ix_ticket_updated_at_id serves it
+CHANGE_FEED_KEY = [Ticket.updated_at, Ticket.id]
+# updated_at is stamped before commit, so a change can become visible with an older timestamp
+# than one already read. The feed only serves changes older than this to leave room for that.
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "5"))
+
+ticket_fields = sparse_fields(TicketRead)
+search_result_fields = sparse_fields(TicketSearchResult)
+
+
+def ticket_models(include_archived: bool) -> list:
+    """Where list endpoints read from: live tickets, plus the archive when the client asks for it."""
+    return [Ticket, TicketArchive] if include_archived else [Ticket]
+
+
+def my_tickets_query(reporter_id: int, model=Ticket):
+    return select(*READ_COLUMNS[model]).where(model.reporter_id == reporter_id)
+
+
+def pending_triage_query():
+    return select(*TICKET_READ_COLUMNS).where(Ticket.status == TicketStatus.new)
+
+
+def all_tickets_query(filters: Optional[TicketFilters] = None, model=Ticket):
+    statement = select(*READ_COLUMNS[model])
+    if filters is None:
+        return statement
+    if filters.status:
+        statement = statement.where(model.status.in_(filters.status))
+    if filters.priority:
+        statement = statement.where(model.priority.in_(filters.priority))
+    if filters.assigned_team is not None:
+        statement = statement.where(model.assigned_team == filters.assigned_team)
+    if filters.assignee_id is not None:
+        statement = statement.where(model.assignee_id == filters.assignee_id)
+    if filters.created_after:
+        statement = statement.where(model.created_at >= filters.created_after)
+    if filters.created_before:
+        statement = statement.where(model.created_at < filters.created_before)
+    if filters.updated_after:
+        statement = statement.where(model.updated_at >= filters.updated_after)
+    if filters.updated_before:
+        statement = statement.where(model.updated_at < filters.updated_before)
+    return statement
+
+
+def ticket_by_id_query(ticket_id: int, fields: Optional[List[str]] = None, access_only: bool = False):
+    """
+    The ticket (or its `fields`, or only the access columns) whether live or archived: a primary
+    key lookup in both tables in one round trip. Archival moves a ticket, so at most one matches.
+    """
+    branches = []
+    for model in (Ticket, TicketArchive):
+        if access_only:
+            statement = select(*ACCESS_COLUMNS[model])
+        else:
+            statement = select_fields(select(*READ_COLUMNS[model]), fields, ACCESS_COLUMNS[model])
+        branches.append(statement.where(model.id == ticket_id))
+    return union_all(*branches)
+
+
+def ticket_history_query(ticket_id: int):
+    return select(*HISTORY_READ_COLUMNS).where(TicketAuditEvent.ticket_id == ticket_id)
+
+
+def ticket_changes_query(now: datetime):
+    settled = now - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    return select(*TICKET_READ_COLUMNS).where(Ticket.updated_at < settled)
+
+
+def can_view_ticket(user: Caller, ticket) -> bool:
+    """Reporters and assignees see their tickets; agents and triage officers see all of them."""
+    return (
+        ticket.reporter_id == user.id
+        or ticket.assignee_id == user.id
+        or user.role in [UserRole.agent, UserRole.triage_officer]
+    )
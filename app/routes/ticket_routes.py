@@ -1,251 +1,612 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from collections import Counter
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, select, SQLModel
-from typing import List
-from app.database.config import get_session
-from app.models.ticket import Ticket, TicketCreate, TicketRead, TicketTriageUpdate, TicketPriority, TicketStatus, TicketAssignUpdate, TicketResolveUpdate
-from app.models.user import User, UserRole
-from app.database.config import get_session
+from typing import Any, Dict, List, Optional
+from pydantic import ValidationError
+from app.database.config import get_read_engine, get_read_session, get_session
+from app.models.ticket import Ticket, TicketCreate, TicketRead, TicketTriageUpdate, TicketPriority, TicketStatus, TicketAssignUpdate, TicketResolveUpdate, TicketBulkCreateResult, TicketBulkItemError, TicketBulkTriageItem, TicketBulkTriageOutcome, TicketSearchResult, TicketSlaReport
+from app.models.ticket_audit import TicketAuditEventRead
+from app.models.user import User
+from app.models.user import UserRole
+from app.services import counters
+from app.services.agent_load import OPEN_STATUSES, agent_load
+from app.services.audit_log import audit_log
+from app.services.analytics import sla_report_cache
+from app.services.identity import Caller, get_caller, identity_cache
+from app.services.ticket_events import TicketEventType, accepts_for, event_stream, ticket_events
+from app.services.ticket_lifecycle import claim_next, insert_tickets, raise_for_failed_transition, transition, transition_many
+from app.database.fulltext import ticket_search_query
+from app.routes.conditional import ETAG_HEADER, TicketPrecondition, is_not_modified, not_modified, ticket_etag, ticket_precondition
+from app.routes.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PageParams, json_object, page_params, paginate, paginate_feed
+from app.routes.ticket_export import MEDIA_TYPES, ExportFormat, stream_export
+from app.routes.ticket_queries import (
+    CHANGE_FEED_KEY, HISTORY_KEY, TICKET_READ_COLUMNS, TicketFilters, all_tickets_query, can_view_ticket,
+    my_tickets_query, pending_triage_query, search_result_fields, ticket_by_id_query, ticket_changes_query,
+    ticket_fields, ticket_filters, ticket_history_query, ticket_models,
+)
 from datetime import datetime
 
 
 router = APIRouter(prefix="/tickets", tags=["Tickets"])
 
+MAX_BULK_TICKETS = 1000
+
+# Counter buckets of a ticket that has not been triaged yet
+NEW_TICKET_BUCKETS = {"status": TicketStatus.new, "priority": None, "assigned_team": None}
+
+def announce(event: TicketEventType, tickets: List[dict], actor: Caller):
+    """After commit: push the changes to live subscribers and queue them for the audit log."""
+    ticket_events.publish_many(event, tickets)
+    audit_log.record_many(event.value, tickets, actor.id)
+
 @router.post("/", response_model=TicketRead, status_code=201)
 def create_ticket(
     ticket: TicketCreate,
     session: Session = Depends(get_session),
-    x_user_id: int = Header(..., alias="X-User-ID")
+    user: Optional[Caller] = Depends(get_caller)
 ):
-    user = session.get(User, x_user_id)
     if not user or user.role != "employee":
         raise HTTPException(status_code=403, detail="Only employees can submit tickets.")
     
     new_ticket = Ticket(**ticket.dict(), reporter_id=user.id)
     session.add(new_ticket)
+    counters.record_change(session, None, NEW_TICKET_BUCKETS)
     session.commit()
     session.refresh(new_ticket)
+    announce(TicketEventType.created, [new_ticket.model_dump()], user)
     return new_ticket
 
+# Items are validated one by one in the handler, so the body is declared as TicketCreate here
+BULK_CREATE_OPENAPI = {"requestBody": {"content": {"application/json": {"schema": {
+    "items": {"$ref": "#/components/schemas/TicketCreate"}, "maxItems": MAX_BULK_TICKETS,
+}}}}}
+
+@router.post("/bulk", response_model=TicketBulkCreateResult, status_code=201, openapi_extra=BULK_CREATE_OPENAPI)
+def create_tickets_bulk(
+    response: Response,
+    tickets: List[Any] = Body(..., description=f"Up to {MAX_BULK_TICKETS} TicketCreate objects"),
+    session: Session = Depends(get_session),
+    user: Optional[Caller] = Depends(get_caller)
+):
+    if not user or user.role != "employee":
+        raise HTTPException(status_code=403, detail="Only employees can submit tickets.")
+    if not tickets or len(tickets) > MAX_BULK_TICKETS:
+        raise HTTPException(status_code=400, detail=f"Submit between 1 and {MAX_BULK_TICKETS} tickets per request")
+
+    # Validate each item on its own so one bad entry does not reject the whole batch
+    now = datetime.utcnow()
+    rows, errors = [], []
+    for index, item in enumerate(tickets):
+        try:
+            ticket = TicketCreate.model_validate(item)
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'body'}: {err['msg']}" for err in e.errors())
+            errors.append(TicketBulkItemError(index=index, detail=detail))
+            continue
+        rows.append({
+            **ticket.model_dump(),
+            "reporter_id": user.id,
+            "status": TicketStatus.new,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    created_ids = insert_tickets(session, rows) if rows else []
+    counters.record_change(session, None, NEW_TICKET_BUCKETS, n=len(created_ids))
+    session.commit()
+    announce(TicketEventType.created, [{**row, "id": ticket_id} for ticket_id, row in zip(created_ids, rows)], user)
+    if not created_ids:
+        response.status_code = 400
+    return TicketBulkCreateResult(created_ids=created_ids, errors=errors)
+
+@router.post("/claim-next", response_model=TicketRead, responses={204: {"description": "Nothing to claim"}})
+def claim_next_ticket(
+    response: Response,
+    agent: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_session)
+):
+    if agent is None or agent.role != UserRole.agent:
+        raise HTTPException(status_code=403, detail="Only agents can claim tickets")
+
+    # The department's most urgent triaged ticket that is not earmarked for someone else
+    ticket = claim_next(session, [
+        Ticket.status == TicketStatus.triaged,
+        Ticket.assigned_team == agent.department,
+        or_(Ticket.assignee_id.is_(None), Ticket.assignee_id == agent.id),
+    ], {"assignee_id": agent.id, "status": TicketStatus.in_progress})
+    if ticket is None:
+        return Response(status_code=204)
+    counters.record_change(session, {"status": TicketStatus.triaged}, {"status": TicketStatus.in_progress})
+    session.commit()
+    agent_load.assigned(ticket["id"], agent.id, ticket["priority"])
+    announce(TicketEventType.assigned, [ticket], agent)
+    response.headers[ETAG_HEADER] = ticket_etag(ticket["id"], ticket["updated_at"])
+    return ticket
+
+@router.put("/bulk/triage", response_model=List[TicketBulkTriageOutcome])
+def triage_tickets_bulk(
+    items: List[TicketBulkTriageItem],
+    session: Session = Depends(get_session),
+    user: Optional[Caller] = Depends(get_caller)
+):
+    if not user or user.role != UserRole.triage_officer:
+        raise HTTPException(status_code=403, detail="Only triage officers can triage tickets")
+    if not items or len(items) > MAX_BULK_TICKETS:
+        raise HTTPException(status_code=400, detail=f"Submit between 1 and {MAX_BULK_TICKETS} tickets per request")
+
+    # Validate every assignee with a single IN query
+    assignee_ids = {item.assignee_id for item in items if item.assignee_id}
+    assignees = {
+        row.id: row for row in session.exec(
+            select(User.id, User.role, User.department).where(User.id.in_(assignee_ids))
+        )
+    } if assignee_ids else {}
+
+    failures, accepted = {}, {}
+    for item in items:
+        assignee = assignees.get(item.assignee_id)
+        if item.ticket_id in accepted or item.ticket_id in failures:
+            failures[item.ticket_id] = "Ticket appears more than once in the batch"
+            accepted.pop(item.ticket_id, None)
+        elif item.assignee_id and (not assignee or assignee.role != UserRole.agent):
+            failures[item.ticket_id] = "Invalid assignee: must be an agent"
+        elif item.assignee_id and assignee.department != item.assigned_team:
+            failures[item.ticket_id] = "Assignee does not belong to the assigned team"
+        elif item.assignee_id and item.auto_assign:
+            failures[item.ticket_id] = "Give either assignee_id or auto_assign, not both"
+        else:
+            accepted[item.ticket_id] = item
+
+    # Auto-assigned items are charged to their agent now, so the rest of the batch spreads out
+    reserved = {}
+    for ticket_id, item in list(accepted.items()):
+        if item.auto_assign:
+            assignee_id = agent_load.reserve(session, item.assigned_team, ticket_id, item.priority)
+            if assignee_id is None:
+                failures[ticket_id] = f"No agents in team '{item.assigned_team}' to auto-assign"
+                del accepted[ticket_id]
+            else:
+                reserved[ticket_id] = assignee_id
+
+    # One set-based UPDATE for the whole batch, guarded on status so nothing is triaged twice
+    triaged = set()
+    if accepted:
+        triaged = transition_many(session, accepted.keys(), [Ticket.status == TicketStatus.new], {
+            "priority": {ticket_id: item.priority for ticket_id, item in accepted.items()},
+            "assigned_team": {ticket_id: item.assigned_team for ticket_id, item in accepted.items()},
+            "assignee_id": {ticket_id: reserved.get(ticket_id, item.assignee_id or None) for ticket_id, item in accepted.items()},
+            "status": TicketStatus.triaged,
+        })
+        deltas = Counter()
+        for item in (accepted[ticket_id] for ticket_id in triaged):
+            deltas.update(counters.change_deltas(NEW_TICKET_BUCKETS, {
+                "status": TicketStatus.triaged, "priority": item.priority, "assigned_team": item.assigned_team,
+            }))
+        counters.apply_deltas(session, deltas)
+        session.commit()
+        for ticket_id, item in accepted.items():
+            if ticket_id in reserved and ticket_id not in triaged:
+                agent_load.unassigned(ticket_id)
+            elif ticket_id in triaged and ticket_id not in reserved:
+                agent_load.assigned(ticket_id, item.assignee_id, item.priority)
+        announce(TicketEventType.triaged, [{
+            "id": ticket_id, "status": TicketStatus.triaged, "priority": accepted[ticket_id].priority,
+            "assigned_team": accepted[ticket_id].assigned_team,
+            "assignee_id": reserved.get(ticket_id, accepted[ticket_id].assignee_id or None),
+        } for ticket_id in sorted(triaged)], user)
+
+    outcomes = []
+    for item in items:
+        if item.ticket_id in triaged:
+            outcomes.append(TicketBulkTriageOutcome(
+                ticket_id=item.ticket_id, success=True, assignee_id=reserved.get(item.ticket_id),
+            ))
+        else:
+            detail = failures.get(item.ticket_id, "Ticket not found or not in 'new' status")
+            outcomes.append(TicketBulkTriageOutcome(ticket_id=item.ticket_id, success=False, detail=detail))
+    return outcomes
+
 @router.get("/my", response_model=list[TicketRead])
 def get_my_tickets(
-    session: Session = Depends(get_session),
-    x_user_id: int = Header(..., alias="X-User-ID")
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_read_session),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    include_archived: bool = Query(False, description="Also list tickets moved to the archive"),
+    user: Optional[Caller] = Depends(get_caller)
 ):
-    user = session.get(User, x_user_id)
     if not user or user.role != "employee":
         raise HTTPException(status_code=403, detail="Only employees can view their tickets.")
     
-    tickets = session.exec(select(Ticket).where(Ticket.reporter_id == user.id)).all()
-    return tickets
+    statements = [my_tickets_query(user.id, model) for model in ticket_models(include_archived)]
+    return paginate(session, statements, page, response, key_columns=[Ticket.id], fields=fields)
 
 # --- REOPEN TICKET ---
 @router.put("/{ticket_id}/reopen", response_model=TicketRead)
-def reopen_ticket(ticket_id: int, session: Session = Depends(get_session), x_user_id: int = Header(..., alias="X-User-ID")):
-    ticket = session.get(Ticket, ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-
-    user = session.get(User, x_user_id)
+def reopen_ticket(
+    ticket_id: int,
+    response: Response,
+    precondition: TicketPrecondition = Depends(ticket_precondition),
+    session: Session = Depends(get_session),
+    user: Optional[Caller] = Depends(get_caller)
+):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if ticket.status != "resolved":
-        raise HTTPException(status_code=400, detail="Only resolved tickets can be reopened")
-
-    if user.role != UserRole.agent and ticket.reporter_id != user.id and ticket.assignee_id != user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to reopen this ticket")
+    conditions = [Ticket.status == TicketStatus.resolved, *precondition.conditions(ticket_id)]
+    if user.role != UserRole.agent:
+        conditions.append(or_(Ticket.reporter_id == user.id, Ticket.assignee_id == user.id))
 
-    ticket.status = "in_progress"
-    ticket.resolved_at = None
-    ticket.resolution_notes = None
-    ticket.updated_at = datetime.utcnow()
-    session.add(ticket)
+    ticket = transition(session, ticket_id, conditions, {
+        "status": TicketStatus.in_progress,
+        "resolved_at": None,
+        "resolution_notes": None,
+    })
+    if ticket is None:
+        raise_for_failed_transition(session, ticket_id, [
+            precondition.check(),
+            (lambda t: t.status != TicketStatus.resolved, 400, "Only resolved tickets can be reopened"),
+            (lambda t: True, 403, "Not authorized to reopen this ticket"),
+        ])
+    counters.record_change(session, {"status": TicketStatus.resolved}, {"status": TicketStatus.in_progress})
     session.commit()
-    session.refresh(ticket)
+    agent_load.assigned(ticket_id, ticket["assignee_id"], ticket["priority"])
+    announce(TicketEventType.reopened, [ticket], user)
+    response.headers[ETAG_HEADER] = ticket_etag(ticket["id"], ticket["updated_at"])
     return ticket
 
 # --- CLOSE TICKET ---
 @router.put("/{ticket_id}/close", response_model=TicketRead)
-def close_ticket(ticket_id: int, session: Session = Depends(get_session), x_user_id: int = Header(..., alias="X-User-ID")):
-    ticket = session.get(Ticket, ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-
-    user = session.get(User, x_user_id)
+def close_ticket(
+    ticket_id: int,
+    response: Response,
+    precondition: TicketPrecondition = Depends(ticket_precondition),
+    session: Session = Depends(get_session),
+    user: Optional[Caller] = Depends(get_caller)
+):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if ticket.status != "resolved":
-        raise HTTPException(status_code=400, detail="Only resolved tickets can be closed")
-
-    if user.role != UserRole.agent and ticket.reporter_id != user.id and ticket.assignee_id != user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to close this ticket")
+    conditions = [Ticket.status == TicketStatus.resolved, *precondition.conditions(ticket_id)]
+    if user.role != UserRole.agent:
+        conditions.append(or_(Ticket.reporter_id == user.id, Ticket.assignee_id == user.id))
 
-    ticket.status = "closed"
-    ticket.updated_at = datetime.utcnow()
-    session.add(ticket)
+    ticket = transition(session, ticket_id, conditions, {"status": TicketStatus.closed})
+    if ticket is None:
+        raise_for_failed_transition(session, ticket_id, [
+            precondition.check(),
+            (lambda t: t.status != TicketStatus.resolved, 400, "Only resolved tickets can be closed"),
+            (lambda t: True, 403, "Not authorized to close this ticket"),
+        ])
+    counters.record_change(session, {"status": TicketStatus.resolved}, {"status": TicketStatus.closed})
     session.commit()
-    session.refresh(ticket)
+    announce(TicketEventType.closed, [ticket], user)
+    response.headers[ETAG_HEADER] = ticket_etag(ticket["id"], ticket["updated_at"])
     return ticket
 
 @router.get("/pending-triage", response_model=List[TicketRead])
 def get_pending_tickets_for_triage(
-    session: Session = Depends(get_session),
-    x_user_id: int = Header(..., alias="X-User-ID")
+    response: Response,
+    page: PageParams = Depends(page_params),
+    session: Session = Depends(get_read_session),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    user: Optional[Caller] = Depends(get_caller)
 ):
-    user = session.get(User, x_user_id)
     if not user or user.role != UserRole.triage_officer:
         raise HTTPException(status_code=403, detail="Only triage officers can access this")
 
-    tickets = session.exec(select(Ticket).where(Ticket.status == TicketStatus.new)).all()
-    return tickets
+    return paginate(session, pending_triage_query(), page, response, key_columns=[Ticket.id], fields=fields)
 
 @router.put("/{ticket_id}/triage", response_model=TicketRead)
 def triage_ticket(
     ticket_id: int,
     update_data: TicketTriageUpdate,
+    response: Response,
+    precondition: TicketPrecondition = Depends(ticket_precondition),
     session: Session = Depends(get_session),
-    x_user_id: int = Header(..., alias="X-User-ID")
+    user: Optional[Caller] = Depends(get_caller)
 ):
     # Validate triage officer role
-    user = session.get(User, x_user_id)
     if not user or user.role != UserRole.triage_officer:
         raise HTTPException(status_code=403, detail="Only triage officers can triage tickets")
 
-    # Fetch ticket
-    ticket = session.get(Ticket, ticket_id)
-    if not ticket or ticket.status != TicketStatus.new:
-        raise HTTPException(status_code=400, detail="Ticket not found or not in 'new' status")
+    if update_data.assignee_id and update_data.auto_assign:
+        raise HTTPException(status_code=400, detail="Give either assignee_id or auto_assign, not both")
 
     # Validate assigned agent if provided
     if update_data.assignee_id:
-        assignee = session.get(User, update_data.assignee_id)
+        assignee = identity_cache.resolve(session, update_data.assignee_id)
         if not assignee or assignee.role != UserRole.agent:
             raise HTTPException(status_code=400, detail="Invalid assignee: must be an agent")
         if assignee.department != update_data.assigned_team:
             raise HTTPException(status_code=400, detail="Assignee does not belong to the assigned team")
 
-        ticket.assignee_id = assignee.id
-    else:
-        ticket.assignee_id = None  # Explicitly clear assignee if not provided
-
-    # Update ticket details
-    ticket.priority = update_data.priority
-    ticket.assigned_team = update_data.assigned_team
-    ticket.status = TicketStatus.triaged
-    ticket.updated_at = datetime.utcnow()
-
-    session.add(ticket)
+    assignee_id = update_data.assignee_id or None  # Explicitly clear assignee if not provided
+    if update_data.auto_assign:
+        assignee_id = agent_load.reserve(session, update_data.assigned_team, ticket_id, update_data.priority)
+        if assignee_id is None:
+            raise HTTPException(status_code=400, detail=f"No agents in team '{update_data.assigned_team}' to auto-assign")
+
+    # Update ticket details only while it is still 'new'
+    ticket = transition(session, ticket_id, [Ticket.status == TicketStatus.new, *precondition.conditions(ticket_id)], {
+        "assignee_id": assignee_id,
+        "priority": update_data.priority,
+        "assigned_team": update_data.assigned_team,
+        "status": TicketStatus.triaged,
+    })
+    if ticket is None:
+        if update_data.auto_assign:
+            agent_load.unassigned(ticket_id)
+        raise_for_failed_transition(session, ticket_id, [
+            precondition.check(),
+            (lambda t: True, 400, "Ticket not found or not in 'new' status"),
+        ], not_found=(400, "Ticket not found or not in 'new' status"))
+    counters.record_change(session, NEW_TICKET_BUCKETS, {
+        "status": TicketStatus.triaged, "priority": update_data.priority, "assigned_team": update_data.assigned_team,
+    })
     session.commit()
-    session.refresh(ticket)
+    if not update_data.auto_assign:
+        agent_load.assigned(ticket_id, assignee_id, update_data.priority)
+    announce(TicketEventType.triaged, [ticket], user)
+    response.headers[ETAG_HEADER] = ticket_etag(ticket["id"], ticket["updated_at"])
     return ticket
 
 @router.get("/", response_model=List[TicketRead])
 def get_all_tickets(
-    x_user_id: int = Header(..., alias="X-User-ID"),
-    session: Session = Depends(get_session)
+    response: Response,
+    page: PageParams = Depends(page_params),
+    filters: TicketFilters = Depends(ticket_filters),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    include_archived: bool = Query(False, description="Also list tickets moved to the archive"),
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
 ):
-    user = session.get(User, x_user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    tickets = session.exec(select(Ticket)).all()
-    return tickets
+    statements = [all_tickets_query(filters, model) for model in ticket_models(include_archived)]
+    return paginate(
+        session, statements, page, response,
+        key_columns=filters.key_columns, descending=filters.descending, fields=fields,
+    )
+
+@router.get("/stats", response_model=Dict[str, Dict[str, int]])
+def get_ticket_stats(
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
+):
+    if not user or user.role not in [UserRole.agent, UserRole.triage_officer]:
+        raise HTTPException(status_code=403, detail="Only agents and triage officers can view ticket stats")
+
+    return counters.read_counters(session)
+
+@router.get("/sla", response_model=TicketSlaReport)
+def get_sla_report(
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
+):
+    if not user or user.role not in [UserRole.agent, UserRole.triage_officer]:
+        raise HTTPException(status_code=403, detail="Only agents and triage officers can view SLA analytics")
+
+    return sla_report_cache.get(session)
+
+@router.get("/changes", response_model=List[TicketRead])
+def get_ticket_changes(
+    response: Response,
+    since: Optional[str] = Query(None, description="X-Next-Cursor of the previous call; omit for a full sync"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, description=f"Page size (capped at {MAX_PAGE_SIZE})"),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    user: Optional[Caller] = Depends(get_caller),
+    # Always the primary: a lagging replica could hand out a cursor past changes it has not applied yet
+    session: Session = Depends(get_session)
+):
+    if not user or user.role not in [UserRole.agent, UserRole.triage_officer]:
+        raise HTTPException(status_code=403, detail="Only agents and triage officers can read the change feed")
+
+    # Tickets changed after the cursor, oldest change first
+    page = PageParams(cursor=since, limit=min(limit, MAX_PAGE_SIZE))
+    return paginate_feed(
+        session, ticket_changes_query(datetime.utcnow()), page, response, key_columns=CHANGE_FEED_KEY, fields=fields,
+    )
+
+@router.get("/events")
+async def stream_ticket_events(user: Optional[Caller] = Depends(get_caller)):
+    # Server-Sent Events for ticket changes, so consoles need not poll the list endpoints
+    if not user or user.role not in [UserRole.agent, UserRole.triage_officer]:
+        raise HTTPException(status_code=403, detail="Only agents and triage officers can follow ticket events")
+
+    subscription = ticket_events.subscribe(accepts_for(user))
+    return StreamingResponse(
+        event_stream(ticket_events, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/search", response_model=List[TicketSearchResult])
+def search_tickets(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(search_result_fields),
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
+):
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    statement, rank = ticket_search_query(session.get_bind().dialect.name, q)
+    statement = statement.with_only_columns(*TICKET_READ_COLUMNS, rank)
+    # Same visibility as GET /tickets/{id}: agents and triage officers see everything
+    if user.role not in ["agent", "triage_officer"]:
+        statement = statement.where(or_(Ticket.reporter_id == user.id, Ticket.assignee_id == user.id))
+
+    return paginate(session, statement, page, response, key_columns=[rank, Ticket.id], descending=True, fields=fields)
+
+@router.get("/export")
+def export_tickets(
+    format: ExportFormat = ExportFormat.ndjson,
+    filters: TicketFilters = Depends(ticket_filters),
+    user: Optional[Caller] = Depends(get_caller),
+    read_engine: Engine = Depends(get_read_engine)
+):
+    if not user or user.role not in [UserRole.agent, UserRole.triage_officer]:
+        raise HTTPException(status_code=403, detail="Only agents and triage officers can export tickets")
+
+    order = [c.desc() if filters.descending else c.asc() for c in filters.key_columns]
+    statement = all_tickets_query(filters).with_only_columns(*Ticket.__table__.c).order_by(*order)
+    return StreamingResponse(
+        stream_export(Session(read_engine), statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format.value}"'},
+    )
 
 @router.get("/{ticket_id}", response_model=TicketRead)
 def get_ticket_by_id(
     ticket_id: int,
-    x_user_id: int = Header(..., alias="X-User-ID"),
-    session: Session = Depends(get_session)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[List[str]] = Depends(ticket_fields),
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
 ):
-    # Fetch the user making the request
-    user = session.exec(select(User).where(User.id == x_user_id)).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Fetch the ticket
-    ticket = session.exec(select(Ticket).where(Ticket.id == ticket_id)).first()
+    # Revalidation: read only the columns needed to authorize and compare versions.
+    # Both lookups fall back to the archive, so archived tickets stay reachable by id.
+    if if_none_match is not None:
+        version = session.exec(ticket_by_id_query(ticket_id, access_only=True)).first()
+        if version and can_view_ticket(user, version):
+            etag = ticket_etag(version.id, version.updated_at)
+            if is_not_modified(if_none_match, etag):
+                return not_modified(etag)
+
+    # Fetch the ticket, or just the requested fields of it
+    ticket = session.exec(ticket_by_id_query(ticket_id, fields)).first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
 
     # Authorization check
-    if (
-        ticket.reporter_id != x_user_id
-        and ticket.assignee_id != x_user_id
-        and user.role not in ["agent", "triage_officer"]
-    ):
+    if not can_view_ticket(user, ticket):
         raise HTTPException(status_code=403, detail="Not authorized to view this ticket")
 
-    return ticket
+    response.headers[ETAG_HEADER] = ticket_etag(ticket.id, ticket.updated_at)
+    return json_object(ticket, response, fields)
+
+@router.get("/{ticket_id}/history", response_model=List[TicketAuditEventRead])
+def get_ticket_history(
+    ticket_id: int,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
+):
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Same access as the ticket itself, archived or not
+    ticket = session.exec(ticket_by_id_query(ticket_id, access_only=True)).first()
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    if not can_view_ticket(user, ticket):
+        raise HTTPException(status_code=403, detail="Not authorized to view this ticket")
+
+    # The log is written behind the request, so the latest change can take a few milliseconds to show up
+    return paginate(session, ticket_history_query(ticket_id), page, response, key_columns=HISTORY_KEY)
 
 @router.put("/{ticket_id}/assign", response_model=TicketRead)
 def assign_ticket(
     ticket_id: int,
     update: TicketAssignUpdate,
-    x_user_id: int = Header(..., alias="X-User-ID"),
+    response: Response,
+    precondition: TicketPrecondition = Depends(ticket_precondition),
+    agent: Optional[Caller] = Depends(get_caller),
     session: Session = Depends(get_session)
 ):
     # Validate the agent performing the action
-    agent = session.get(User, x_user_id)
     if agent is None or agent.role != "agent":
         raise HTTPException(status_code=403, detail="Only agents can assign tickets")
 
-    # Fetch the ticket
-    ticket = session.get(Ticket, ticket_id)
-    if ticket is None:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-
-    # Check if ticket's assigned team matches agent's department
-    if ticket.assigned_team and agent.department != ticket.assigned_team:
-        raise HTTPException(status_code=403, detail="You cannot assign tickets outside your department")
+    if update.auto_assign == (update.assignee_id is not None):
+        raise HTTPException(status_code=400, detail="Give either assignee_id or auto_assign")
 
-    # Validate target assignee
-    target_agent = session.get(User, update.assignee_id)
-    if target_agent is None or target_agent.role != "agent":
-        raise HTTPException(status_code=400, detail="Invalid assignee: must be an agent")
-    if target_agent.department != ticket.assigned_team:
-        raise HTTPException(status_code=400, detail="Assignee does not belong to this ticket's team")
-
-    # Perform the assignment
-    ticket.assignee_id = update.assignee_id
-    if ticket.status == TicketStatus.triaged:
-        ticket.status = TicketStatus.in_progress
-    ticket.updated_at = datetime.utcnow()
+    # Validate target assignee, or pick the least loaded agent of the caller's department
+    if update.auto_assign:
+        assignee_id = agent_load.pick(session, agent.department)
+        if assignee_id is None:
+            raise HTTPException(status_code=400, detail=f"No agents in team '{agent.department}' to auto-assign")
+        target_agent = Caller(id=assignee_id, role=UserRole.agent, department=agent.department)
+    else:
+        target_agent = identity_cache.resolve(session, update.assignee_id)
+        if target_agent is None or target_agent.role != "agent":
+            raise HTTPException(status_code=400, detail="Invalid assignee: must be an agent")
 
-    session.add(ticket)
+    # Assign only if the ticket's team matches both the acting agent's department and the assignee's
+    team_conditions = [
+        or_(Ticket.assigned_team.is_(None), Ticket.assigned_team == agent.department),
+        Ticket.assigned_team == target_agent.department,
+        *precondition.conditions(ticket_id),
+    ]
+    # Common case first: a triaged ticket moves to in progress. Anything else is a plain
+    # reassignment. Splitting the two tells us the old status without reading the row.
+    ticket = transition(session, ticket_id, [Ticket.status == TicketStatus.triaged, *team_conditions], {
+        "assignee_id": target_agent.id,
+        "status": TicketStatus.in_progress,
+    })
+    if ticket is not None:
+        counters.record_change(session, {"status": TicketStatus.triaged}, {"status": TicketStatus.in_progress})
+    else:
+        ticket = transition(session, ticket_id, [Ticket.status != TicketStatus.triaged, *team_conditions], {
+            "assignee_id": target_agent.id,
+        })
+    if ticket is None:
+        raise_for_failed_transition(session, ticket_id, [
+            precondition.check(),
+            (lambda t: t.assigned_team and agent.department != t.assigned_team,
+             403, "You cannot assign tickets outside your department"),
+            (lambda t: target_agent.department != t.assigned_team,
+             400, "Assignee does not belong to this ticket's team"),
+        ])
     session.commit()
-    session.refresh(ticket)
+    if ticket["status"] in OPEN_STATUSES:
+        agent_load.assigned(ticket_id, ticket["assignee_id"], ticket["priority"])
+    else:
+        # Reassigning a new, resolved or closed ticket puts no load on the assignee
+        agent_load.unassigned(ticket_id)
+    announce(TicketEventType.assigned, [ticket], agent)
+    response.headers[ETAG_HEADER] = ticket_etag(ticket["id"], ticket["updated_at"])
     return ticket
 
 @router.put("/{ticket_id}/resolve", response_model=TicketRead)
 def resolve_ticket(
     ticket_id: int,
     update: TicketResolveUpdate,
-    x_user_id: int = Header(..., alias="X-User-ID"),
+    response: Response,
+    precondition: TicketPrecondition = Depends(ticket_precondition),
+    agent: Optional[Caller] = Depends(get_caller),
     session: Session = Depends(get_session)
 ):
     # Check if the user is an agent
-    agent = session.get(User, x_user_id)
     if agent is None or agent.role != "agent":
         raise HTTPException(status_code=403, detail="Only agents can resolve tickets")
 
-    # Check if the ticket exists
-    ticket = session.get(Ticket, ticket_id)
+    # Resolve only tickets that are still in progress
+    ticket = transition(session, ticket_id, [Ticket.status == TicketStatus.in_progress, *precondition.conditions(ticket_id)], {
+        "status": TicketStatus.resolved,
+        "resolution_notes": update.resolution_notes,
+        "resolved_at": datetime.utcnow(),
+    })
     if ticket is None:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-
-    # Check if the ticket is in progress
-    if ticket.status != "in_progress":
-        raise HTTPException(status_code=400, detail="Ticket must be in progress to resolve")
-
-    # Update ticket status and notes
-    ticket.status = "resolved"
-    ticket.resolution_notes = update.resolution_notes
-    ticket.resolved_at = datetime.utcnow()
-    ticket.updated_at = datetime.utcnow()
-
-    session.add(ticket)
+        raise_for_failed_transition(session, ticket_id, [
+            precondition.check(),
+            (lambda t: t.status != TicketStatus.in_progress, 400, "Ticket must be in progress to resolve"),
+        ])
+    counters.record_change(session, {"status": TicketStatus.in_progress}, {"status": TicketStatus.resolved})
     session.commit()
-    session.refresh(ticket)
-
-    return ticket
\ No newline at end of file
+    agent_load.unassigned(ticket_id)
+    announce(TicketEventType.resolved, [ticket], agent)
+    response.headers[ETAG_HEADER] = ticket_etag(ticket["id"], ticket["updated_at"])
+    return ticket
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlmodel import Session, select
+from typing import List, Optional
 from app.models.user import User, UserCreate, UserRead, UserRole
-from app.database.config import get_session
+from app.database.config import get_read_session, get_session
+from app.routes.conditional import ETAG_HEADER, is_not_modified, not_modified, user_etag
+from app.routes.pagination import PageParams, json_object, page_params, paginate, read_columns
+from app.routes.sparse_fields import select_fields, sparse_fields
+from app.services.agent_load import agent_load
+from app.services.identity import Caller, get_caller, identity_cache
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# Shared with async_user_routes.py
+USER_READ_COLUMNS = read_columns(User.__table__, UserRead)
+user_fields = sparse_fields(UserRead)
+
 @router.post("/", response_model=UserRead, status_code=201)
 def create_user(user: UserCreate, session: Session = Depends(get_session)):
     # Pre-check for existing username or email
@@ -29,6 +39,10 @@ def create_user(user: UserCreate, session: Session = Depends(get_session)):
     try:
         session.commit()
         session.refresh(db_user)
+        # The id may have belonged to a cached (since deleted) user; never serve a stale identity
+        identity_cache.invalidate(db_user.id)
+        if db_user.role == UserRole.agent:
+            agent_load.add_agent(db_user.id, db_user.department)
     except IntegrityError:
         session.rollback()
         # This handles potential race condition where another process inserted same user at the same time
@@ -37,27 +51,29 @@ def create_user(user: UserCreate, session: Session = Depends(get_session)):
 
 @router.get("/", response_model=list[UserRead])
 def get_users(
-    x_user_id: int = Header(..., alias="X-User-ID"),
-    session: Session = Depends(get_session)
+    response: Response,
+    page: PageParams = Depends(page_params),
+    fields: Optional[List[str]] = Depends(user_fields),
+    user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
 ):
-    user = session.get(User, x_user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     if user.role not in ["triage_officer", "agent"]:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    users = session.exec(select(User)).all()
-    return users
+    return paginate(session, select(*USER_READ_COLUMNS), page, response, key_columns=[User.id], fields=fields)
 
 @router.get("/{user_id}", response_model=UserRead)
 def get_user(
     user_id: int,
-    x_user_id: int = Header(..., alias="X-User-ID"),
-    session: Session = Depends(get_session)
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    fields: Optional[List[str]] = Depends(user_fields),
+    requesting_user: Optional[Caller] = Depends(get_caller),
+    session: Session = Depends(get_read_session)
 ):
-    # Fetch the requesting user
-    requesting_user = session.get(User, x_user_id)
     if not requesting_user:
         raise HTTPException(status_code=404, detail="Requesting user not found")
 
@@ -65,9 +81,16 @@ def get_user(
     if requesting_user.role == "employee" and requesting_user.id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Fetch the target user
-    target_user = session.get(User, user_id)
+    # Fetch the target user, or just the requested fields of it
+    if fields is None:
+        target_user = session.get(User, user_id)
+    else:
+        target_user = session.exec(select_fields(select(*USER_READ_COLUMNS), fields).where(User.id == user_id)).first()
     if not target_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return target_user
\ No newline at end of file
+    etag = user_etag(target_user, fields)
+    if is_not_modified(if_none_match, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    return target_user if fields is None else json_object(target_user, response, fields)
\ No newline at end of file
@@ -0,0 +1,195 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User, UserRole
+
+# How much of an agent's capacity one open ticket takes, by priority
+PRIORITY_WEIGHTS = {
+    TicketPriority.critical: 8,
+    TicketPriority.high: 4,
+    TicketPriority.medium: 2,
+    TicketPriority.low: 1,
+}
+# Tickets reassigned before triage have no priority yet
+UNPRIORITIZED_WEIGHT = 1
+# Statuses in which a ticket counts against its assignee
+OPEN_STATUSES = (TicketStatus.triaged, TicketStatus.in_progress)
+# Loads are rebuilt from the database this often, to take in changes made by other workers
+RESEED_SECONDS = float(os.getenv("AUTO_ASSIGN_RESEED_SECONDS", "300"))
+
+logger = logging.getLogger("app.agent_load")
+
+
+def ticket_weight(priority: Optional[TicketPriority]) -> int:
+    return PRIORITY_WEIGHTS.get(priority, UNPRIORITIZED_WEIGHT)
+
+
+def agent_tickets_query():
+    """Every agent with each of their open tickets (id, priority), or one row of NULLs if they have none."""
+    return (
+        select(User.id, User.department, Ticket.id, Ticket.priority)
+        .select_from(User)
+        .outerjoin(Ticket, and_(Ticket.assignee_id == User.id, Ticket.status.in_(OPEN_STATUSES)))
+        .where(User.role == UserRole.agent)
+    )
+
+
+class AgentLoadBalancer:
+    """
+    Weighted open-ticket load of every agent, with a min-heap per department to find the
+    least loaded one in O(log n). Heaps are updated lazily: a changed load is pushed as a new
+    entry and entries that no longer match `_loads` are discarded when they reach the top.
+    Open tickets are tracked individually so a reassignment releases the previous assignee.
+    """
+
+    def __init__(self, reseed_seconds: float = RESEED_SECONDS):
+        self.reseed_seconds = reseed_seconds
+        self._lock = threading.Lock()
+        self._loads: Dict[int, int] = {}
+        self._teams: Dict[int, str] = {}
+        self._heaps: Dict[str, List[Tuple[int, int]]] = {}
+        # ticket id -> (assignee id, weight) for open tickets
+        self._tickets: Dict[int, Tuple[int, int]] = {}
+        self._seeded_at: Optional[float] = None
+        self._reseeder: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def seed(self, session: Session):
+        """Rebuild every load and heap from one query."""
+        loads, teams, tickets = {}, {}, {}
+        for agent_id, department, ticket_id, priority in session.exec(agent_tickets_query()):
+            teams[agent_id] = department
+            loads.setdefault(agent_id, 0)
+            if ticket_id is not None:
+                tickets[ticket_id] = (agent_id, ticket_weight(priority))
+                loads[agent_id] += tickets[ticket_id][1]
+        heaps = {}
+        for agent_id, load in loads.items():
+            heaps.setdefault(teams[agent_id], []).append((load, agent_id))
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        with self._lock:
+            self._loads, self._teams, self._heaps, self._tickets = loads, teams, heaps, tickets
+            self._seeded_at = time.monotonic()
+
+    def _seed_if_needed(self, session: Session):
+        """Only the first pick after a `clear` seeds in the request; `start` keeps loads fresh after that."""
+        if self._seeded_at is None:
+            self.seed(session)
+
+    def start(self, engine: Engine):
+        """Reseed from `engine` every reseed_seconds in a background thread, off the request path."""
+        with self._lock:
+            if self._reseeder is not None:
+                return
+            self._stop = threading.Event()
+            self._reseeder = threading.Thread(
+                target=self._reseed_periodically, args=(engine, self._stop), name="agent-load-reseed", daemon=True,
+            )
+        self._reseeder.start()
+
+    def stop(self):
+        with self._lock:
+            reseeder, self._reseeder = self._reseeder, None
+        if reseeder is not None:
+            self._stop.set()
+            reseeder.join()
+
+    def _reseed_periodically(self, engine: Engine, stop: threading.Event):
+        while not stop.wait(self.reseed_seconds):
+            try:
+                with Session(engine) as session:
+                    self.seed(session)
+            except Exception:
+                logger.exception("Reseeding agent loads failed; keeping the current ones")
+
+    def _add_load(self, agent_id: int, delta: int):
+        """Caller holds the lock."""
+        if agent_id not in self._loads:
+            return
+        load = self._loads[agent_id] = max(0, self._loads[agent_id] + delta)
+        team = self._teams[agent_id]
+        heap = self._heaps[team]
+        heapq.heappush(heap, (load, agent_id))
+        if len(heap) > 2 * len(self._loads) + 64:
+            self._compact(team)
+
+    def _compact(self, team: str):
+        heap = [(load, agent_id) for agent_id, load in self._loads.items() if self._teams[agent_id] == team]
+        heapq.heapify(heap)
+        self._heaps[team] = heap
+
+    def _least_loaded(self, team: str) -> Optional[int]:
+        """Caller holds the lock."""
+        heap = self._heaps.get(team)
+        while heap:
+            load, agent_id = heap[0]
+            if self._loads.get(agent_id) == load and self._teams.get(agent_id) == team:
+                return agent_id
+            heapq.heappop(heap)
+        return None
+
+    def _assign(self, ticket_id: int, agent_id: Optional[int], weight: int):
+        """Caller holds the lock."""
+        previous = self._tickets.pop(ticket_id, None)
+        if previous is not None:
+            self._add_load(previous[0], -previous[1])
+        if agent_id is not None:
+            self._tickets[ticket_id] = (agent_id, weight)
+            self._add_load(agent_id, weight)
+
+    def add_agent(self, agent_id: int, department: str):
+        with self._lock:
+            if self._seeded_at is None or agent_id in self._loads:
+                return
+            self._loads[agent_id], self._teams[agent_id] = 0, department
+            heapq.heappush(self._heaps.setdefault(department, []), (0, agent_id))
+
+    def pick(self, session: Session, team: str) -> Optional[int]:
+        """The least loaded agent of `team`, or None when it has none. Report the assignment with `assigned`."""
+        self._seed_if_needed(session)
+        with self._lock:
+            return self._least_loaded(team)
+
+    def reserve(self, session: Session, team: str, ticket_id: int, priority: Optional[TicketPriority]) -> Optional[int]:
+        """
+        `pick` and `assigned` in one step, so that picks made before the assignment commits
+        spread out. If the assignment then fails, give the ticket back with `unassigned`.
+        """
+        self._seed_if_needed(session)
+        with self._lock:
+            agent_id = self._least_loaded(team)
+            if agent_id is not None:
+                self._assign(ticket_id, agent_id, ticket_weight(priority))
+            return agent_id
+
+    def assigned(self, ticket_id: int, agent_id: Optional[int], priority: Optional[TicketPriority]):
+        """The open ticket now belongs to `agent_id` (or nobody), whoever had it before."""
+        with self._lock:
+            self._assign(ticket_id, agent_id, ticket_weight(priority))
+
+    def unassigned(self, ticket_id: int):
+        """The ticket was resolved, or its assignment did not go through."""
+        with self._lock:
+            self._assign(ticket_id, None, 0)
+
+    def loads(self, team: str) -> Dict[int, int]:
+        with self._lock:
+            return {agent_id: load for agent_id, load in self._loads.items() if self._teams[agent_id] == team}
+
+    def clear(self):
+        with self._lock:
+            self._loads, self._teams, self._heaps, self._tickets = {}, {}, {}, {}
+            self._seeded_at = None
+
+
+agent_load = AgentLoadBalancer()
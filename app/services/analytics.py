@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, func, literal, select, text
+from sqlmodel import Session
+
+from app.models.ticket import Ticket, TicketPriority
+
+PERCENTILES = (50, 90, 99)
+NONE_BUCKET = "none"
+# Breakdown keys come out of SQL as integers; NULL becomes NONE_CODE (ticket ids are positive)
+NONE_CODE = -1
+# Breakdowns reported next to the overall numbers, in query column order
+BREAKDOWNS = ("priority", "assigned_team", "assignee_id")
+
+SLA_REPORT_TTL = float(os.getenv("SLA_REPORT_TTL", "30"))
+
+
+def _seconds_between(dialect: str, start, end):
+    if dialect == "mysql":
+        return func.timestampdiff(text("MICROSECOND"), start, end) / 1e6
+    if dialect == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    return func.extract("epoch", end - start)
+
+
+def _label_code(column, labels: list):
+    """`column` as its index into `labels`, NONE_CODE for NULL (or a value `labels` lacks)."""
+    if not labels:
+        return literal(NONE_CODE)
+    return case({label: code for code, label in enumerate(labels)}, value=column, else_=NONE_CODE)
+
+
+def _report_query(dialect: str, now: datetime, teams: List[str]):
+    """
+    One row per ticket with only what the report needs: the breakdown keys as integers (priority
+    and team as their index into TicketPriority and `teams`), whether it is resolved, and its
+    resolution time (resolved) or age (open) in seconds.
+    """
+    resolved = Ticket.resolved_at.is_not(None)
+    return select(
+        _label_code(Ticket.priority, [priority.name for priority in TicketPriority]),
+        _label_code(Ticket.assigned_team, teams),
+        func.coalesce(Ticket.assignee_id, NONE_CODE),
+        case((resolved, 1), else_=0),
+        _seconds_between(dialect, Ticket.created_at, func.coalesce(Ticket.resolved_at, now)),
+    )
+
+
+# Layout of `_report_query` rows once loaded into NumPy
+REPORT_DTYPE = np.dtype([*((name, np.int64) for name in BREAKDOWNS), ("resolved", bool), ("seconds", float)])
+
+
+def _factorize(column: np.ndarray, labels: Optional[list] = None) -> Tuple[list, np.ndarray]:
+    """
+    Distinct values of an integer key `column` and each row's index into them. A value is
+    labelled `labels[value]`, or the value itself without `labels`; NONE_CODE is NONE_BUCKET.
+    """
+    values, codes = np.unique(column, return_inverse=True)
+    names = [NONE_BUCKET if v == NONE_CODE else str(v if labels is None else labels[v]) for v in values.tolist()]
+    return names, codes.reshape(-1)
+
+
+def _summary(ordered: np.ndarray) -> dict:
+    if not len(ordered):
+        return {"count": 0, **{f"p{p}": None for p in PERCENTILES}}
+    return {"count": len(ordered), **dict(zip(
+        (f"p{p}" for p in PERCENTILES), np.percentile(ordered, PERCENTILES).tolist()
+    ))}
+
+
+def _grouped_summaries(labels: list, codes: np.ndarray, ordered: np.ndarray) -> Dict[str, dict]:
+    """
+    `_summary` for every group at once. `ordered` is sorted ascending and `codes` gives each
+    value's index into `labels`. A stable sort by code keeps each group's values in order, so
+    every percentile is read for all groups with index arithmetic (as np.percentile interpolates).
+    """
+    counts = np.bincount(codes, minlength=len(labels))
+    grouped = ordered[np.argsort(codes, kind="stable")]
+    present = np.flatnonzero(counts)
+    counts, starts = counts[present], (np.cumsum(counts) - counts)[present]
+    columns = {"count": counts}
+    for p in PERCENTILES:
+        position = starts + (counts - 1) * (p / 100)
+        low = np.floor(position).astype(np.intp)
+        high = np.minimum(low + 1, starts + counts - 1)
+        columns[f"p{p}"] = grouped[low] + (grouped[high] - grouped[low]) * (position - low)
+    columns = {name: column.tolist() for name, column in columns.items()}
+    return {labels[code]: {name: column[i] for name, column in columns.items()} for i, code in enumerate(present.tolist())}
+
+
+def load_report_table(session: Session, now: datetime) -> Tuple[np.ndarray, Dict[str, Optional[list]]]:
+    """Run `_report_query` and load it as a REPORT_DTYPE array, with the labels of each breakdown's codes."""
+    connection = session.connection()
+    # A handful of teams, read off the leading column of ix_ticket_team_status_priority
+    teams = list(connection.execute(
+        select(Ticket.assigned_team).where(Ticket.assigned_team.is_not(None)).distinct().order_by(Ticket.assigned_team)
+    ).scalars())
+    result = connection.execute(_report_query(connection.dialect.name, now, teams))
+    try:
+        # Plain driver tuples: building a Row per ticket would cost more than the whole report
+        rows = result.cursor.fetchall()
+    finally:
+        result.close()
+    labels = {"priority": [priority.value for priority in TicketPriority], "assigned_team": teams, "assignee_id": None}
+    return np.fromiter(rows, dtype=REPORT_DTYPE, count=len(rows)), labels
+
+
+def sla_report(session: Session, now: Optional[datetime] = None) -> dict:
+    """
+    p50/p90/p99 time-to-resolve of resolved tickets and age of open tickets, in seconds,
+    overall and by priority, team and assignee. Reads the columns once and does the math in NumPy.
+    """
+    now = now or datetime.utcnow()
+    table, labels = load_report_table(session, now)
+    keys = {name: _factorize(table[name], labels[name]) for name in BREAKDOWNS}
+
+    report = {"generated_at": now}
+    for name, mask in (("resolution_seconds", table["resolved"]), ("backlog_age_seconds", ~table["resolved"])):
+        seconds = table["seconds"][mask]
+        order = np.argsort(seconds)
+        ordered = seconds[order]
+        report[name] = {"overall": _summary(ordered)}
+        for breakdown, (labels, codes) in keys.items():
+            report[name][breakdown] = _grouped_summaries(labels, codes[mask][order], ordered)
+    return report
+
+
+class ReportCache:
+    """Holds the last report for `ttl` seconds so dashboards polling it share one computation."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[float, dict]] = None
+
+    def get(self, session: Session) -> dict:
+        with self._lock:
+            if self._entry is not None and self._entry[0] > time.monotonic():
+                return self._entry[1]
+        report = sla_report(session)
+        with self._lock:
+            self._entry = (time.monotonic() + self.ttl, report)
+        return report
+
+    def clear(self):
+        with self._lock:
+            self._entry = None
+
+
+sla_report_cache = ReportCache(ttl=SLA_REPORT_TTL)
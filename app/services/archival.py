@@ -0,0 +1,86 @@
+import argparse
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlmodel import Session
+
+from app.models.ticket import PRECISE_DATETIME, Ticket, TicketStatus
+from app.models.ticket_archive import TicketArchive
+from app.services import counters
+
+# Closed tickets older than this move to ticket_archive
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+# Tickets moved per transaction; keeps locks and undo short on a live database
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+
+def archive_batch(session: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move up to `batch_size` tickets closed before `cutoff` into ticket_archive, and take them
+    off the counters, in one transaction. Closed is final, so updated_at is when the ticket was
+    closed. Returns how many tickets moved. Commits.
+
+    The newest ticket always stays live, so MAX(ticket.id) stays above every archived id and an
+    auto-increment counter rebuilt from it (InnoDB before 8.0 does so on restart) cannot hand an
+    archived ticket's id out again.
+    """
+    table = Ticket.__table__
+    newest = select(func.max(table.c.id)).scalar_subquery()
+    rows = session.execute(
+        select(table.c.id, table.c.priority, table.c.assigned_team)
+        .where(table.c.status == TicketStatus.closed, table.c.updated_at < cutoff, table.c.id < newest)
+        .order_by(table.c.id)
+        .limit(batch_size)
+    ).all()
+    if not rows:
+        return 0
+
+    ids = [row.id for row in rows]
+    names = [column.name for column in table.c]
+    archived_at = literal(datetime.utcnow(), PRECISE_DATETIME)
+    session.execute(insert(TicketArchive.__table__).from_select(
+        [*names, "archived_at"], select(*table.c, archived_at).where(table.c.id.in_(ids)),
+    ))
+    # Re-check the status so nothing but what was just copied is deleted
+    session.execute(delete(table).where(table.c.id.in_(ids), table.c.status == TicketStatus.closed))
+
+    deltas = Counter()
+    for row in rows:
+        deltas.update(counters.change_deltas({
+            "status": TicketStatus.closed, "priority": row.priority, "assigned_team": row.assigned_team,
+        }, None))
+    counters.apply_deltas(session, deltas)
+    session.commit()
+    return len(ids)
+
+
+def archive_closed_tickets(
+    session: Session, days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = 0.0, now: Optional[datetime] = None,
+) -> int:
+    """Archive every ticket closed more than `days` ago, batch by batch, sleeping `pause` seconds in between."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    total = 0
+    while True:
+        moved = archive_batch(session, cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        time.sleep(pause)
+
+
+if __name__ == "__main__":
+    from app.database.config import engine
+
+    parser = argparse.ArgumentParser(description="Move tickets closed more than --days ago to ticket_archive.")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=0.1, help="seconds between batches, to let replicas keep up")
+    args = parser.parse_args()
+    with Session(engine) as session:
+        moved = archive_closed_tickets(session, args.days, args.batch_size, args.pause)
+    print(f"Archived {moved} tickets")
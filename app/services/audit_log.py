@@ -0,0 +1,151 @@
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Mapping, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.models.ticket_audit import TicketAuditEvent
+
+logger = logging.getLogger("app.audit_log")
+
+# Events waiting to be written; beyond this, handlers wait up to AUDIT_LOG_ENQUEUE_TIMEOUT_MS and then drop
+QUEUE_SIZE = int(os.getenv("AUDIT_LOG_QUEUE_SIZE", "10000"))
+# An INSERT goes out once this many events are waiting, or FLUSH_MS after the first of them
+BATCH_SIZE = int(os.getenv("AUDIT_LOG_BATCH_SIZE", "500"))
+FLUSH_MS = float(os.getenv("AUDIT_LOG_FLUSH_MS", "20"))
+ENQUEUE_TIMEOUT_MS = float(os.getenv("AUDIT_LOG_ENQUEUE_TIMEOUT_MS", "5"))
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Write-behind log of ticket changes into the ticket_events table. Handlers only enqueue;
+    one background thread batches the queue into multi-row INSERTs, so a write request never
+    waits on the audit INSERT. The queue is bounded: when the writer falls behind, handlers
+    wait briefly (backpressure) and then drop the event rather than stall, and both are counted.
+    """
+
+    def __init__(
+        self, queue_size: int = QUEUE_SIZE, batch_size: int = BATCH_SIZE,
+        flush_ms: float = FLUSH_MS, enqueue_timeout_ms: float = ENQUEUE_TIMEOUT_MS,
+    ):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = self.blocked = self.dropped = 0
+        self.written = self.failed = self.batches = 0
+
+    def start(self, engine: Engine):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._engine = engine
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Write everything queued so far, then stop the writer."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def flush(self):
+        """Block until every event queued so far has been written (or failed)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def record(self, event: str, ticket: Mapping, actor_id: int):
+        self.record_many(event, [ticket], actor_id)
+
+    def record_many(self, event: str, tickets: Iterable[Mapping], actor_id: int):
+        """Queue committed changes made by `actor_id`. Safe to call from any thread."""
+        now = datetime.utcnow()
+        for ticket in tickets:
+            self._put({
+                "ticket_id": ticket["id"], "event": event, "actor_id": actor_id, "status": ticket["status"],
+                "priority": ticket.get("priority"), "assigned_team": ticket.get("assigned_team"),
+                "assignee_id": ticket.get("assignee_id"), "created_at": now,
+            })
+
+    def _put(self, row: dict):
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.blocked += 1
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return
+        with self._lock:
+            self.enqueued += 1
+
+    def _next_batch(self) -> list:
+        """The first waiting event, and whatever follows it within the flush interval, up to batch_size."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            rows = [row for row in batch if row is not _STOP]
+            if rows:
+                self._write(rows)
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is _STOP:
+                return
+
+    def _write(self, rows: List[dict]):
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(insert(TicketAuditEvent.__table__), rows)
+        except Exception:
+            logger.exception("Dropped %d audit events: the INSERT failed", len(rows))
+            with self._lock:
+                self.failed += len(rows)
+            return
+        with self._lock:
+            self.written += len(rows)
+            self.batches += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "queued": self._queue.qsize(),
+                "capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "blocked": self.blocked,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+            }
+
+
+audit_log = AuditLogWriter()
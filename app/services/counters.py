@@ -0,0 +1,120 @@
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_counter import TicketCounter
+
+# Ticket columns that dashboards break counts down by
+DIMENSIONS = ("status", "priority", "assigned_team")
+NONE_BUCKET = "none"
+
+
+def _bucket(value) -> str:
+    if value is None:
+        return NONE_BUCKET
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def record_change(session: Session, before: Optional[dict], after: Optional[dict], n: int = 1):
+    """
+    Adjust the counters for `n` tickets moving from the `before` values to the `after` values,
+    in the caller's transaction. None means the tickets did not exist before / no longer exist.
+    For an update, dimensions missing from `after` are unchanged.
+    """
+    apply_deltas(session, change_deltas(before, after, n))
+
+
+def change_deltas(before: Optional[dict], after: Optional[dict], n: int = 1) -> Counter:
+    """The (dimension, bucket) deltas `record_change` applies; sum several to batch them."""
+    deltas = Counter()
+    for dimension in DIMENSIONS:
+        if before is not None and after is not None and dimension not in after:
+            continue
+        old = _bucket(before.get(dimension)) if before is not None else None
+        new = _bucket(after.get(dimension)) if after is not None else None
+        if old == new:
+            continue
+        if old is not None:
+            deltas[(dimension, old)] -= n
+        if new is not None:
+            deltas[(dimension, new)] += n
+    return deltas
+
+
+def apply_deltas(session: Session, deltas: Counter):
+    """Add each (dimension, bucket) delta with one upsert statement."""
+    rows = [
+        {"dimension": dimension, "bucket": bucket, "count": delta}
+        for (dimension, bucket), delta in sorted(deltas.items())  # fixed order avoids lock-order deadlocks
+        if delta
+    ]
+    if not rows:
+        return
+    table = TicketCounter.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(count=table.c.count + statement.inserted["count"])
+    elif dialect == "sqlite":
+        statement = sqlite_insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.dimension, table.c.bucket],
+            set_={"count": table.c.count + statement.excluded["count"]},
+        )
+    else:
+        for row in rows:
+            updated = session.execute(
+                update(table)
+                .where(table.c.dimension == row["dimension"], table.c.bucket == row["bucket"])
+                .values(count=table.c.count + row["count"])
+            )
+            if updated.rowcount == 0:
+                session.add(TicketCounter(**row))
+        return
+    session.execute(statement)
+
+
+def read_counters(session: Session) -> Dict[str, Dict[str, int]]:
+    """All counters grouped by dimension; every status and priority is present, even at zero."""
+    stats = {
+        "status": {status.value: 0 for status in TicketStatus},
+        "priority": {NONE_BUCKET: 0, **{priority.value: 0 for priority in TicketPriority}},
+        "assigned_team": {},
+    }
+    for row in session.exec(select(TicketCounter.dimension, TicketCounter.bucket, TicketCounter.count)):
+        if row.count or row.dimension != "assigned_team":
+            stats.setdefault(row.dimension, {})[row.bucket] = row.count
+    return stats
+
+
+def rebuild_counters(session: Session):
+    """Recompute every counter from the ticket table, reconciling any drift. Commits."""
+    session.execute(delete(TicketCounter.__table__))
+    deltas = Counter()
+    for dimension in DIMENSIONS:
+        column = getattr(Ticket, dimension)
+        for value, count in session.execute(select(column, func.count()).group_by(column)):
+            deltas[(dimension, _bucket(value))] += count
+    apply_deltas(session, deltas)
+    session.commit()
+
+
+def ensure_counters(engine: Engine):
+    """Seed the counters once for a database that has tickets but no counters yet."""
+    with Session(engine) as session:
+        has_counters = session.execute(select(TicketCounter.dimension).limit(1)).first()
+        has_tickets = session.execute(select(Ticket.id).limit(1)).first()
+        if has_tickets and not has_counters:
+            rebuild_counters(session)
+
+
+if __name__ == "__main__":
+    from app.database.config import engine
+    with Session(engine) as session:
+        rebuild_counters(session)
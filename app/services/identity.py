@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from fastapi import Depends, Header
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.async_config import get_async_session
+from app.database.config import get_session
+from app.models.user import User, UserRole
+
+
+class Caller(NamedTuple):
+    """The parts of a user that authorization checks need."""
+    id: int
+    role: UserRole
+    department: Optional[str]
+
+
+class IdentityCache:
+    """Bounded LRU cache of user id -> Caller, with entries expiring after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, tuple[float, Caller]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[Caller]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, caller: Caller):
+        with self._lock:
+            self._entries[caller.id] = (time.monotonic() + self.ttl, caller)
+            self._entries.move_to_end(caller.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def resolve(self, session: Session, user_id: int) -> Optional[Caller]:
+        """Return the cached Caller, loading (id, role, department) on a miss. Unknown ids are not cached."""
+        caller = self.get(user_id)
+        if caller is not None:
+            return caller
+        return self._remember(session.exec(_caller_query(user_id)).first())
+
+    async def resolve_async(self, session: AsyncSession, user_id: int) -> Optional[Caller]:
+        """`resolve` for an AsyncSession."""
+        caller = self.get(user_id)
+        if caller is not None:
+            return caller
+        return self._remember((await session.exec(_caller_query(user_id))).first())
+
+    def _remember(self, row) -> Optional[Caller]:
+        if row is None:
+            return None
+        caller = Caller(id=row.id, role=UserRole(row.role), department=row.department)
+        self.put(caller)
+        return caller
+
+
+def _caller_query(user_id: int):
+    return select(User.id, User.role, User.department).where(User.id == user_id)
+
+
+identity_cache = IdentityCache(
+    maxsize=int(os.getenv("IDENTITY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("IDENTITY_CACHE_TTL", "60")),
+)
+
+
+def get_caller(
+    x_user_id: int = Header(..., alias="X-User-ID"),
+    session: Session = Depends(get_session)
+) -> Optional[Caller]:
+    """Resolve the X-User-ID header to a Caller, or None if no such user exists."""
+    caller = identity_cache.resolve(session, x_user_id)
+    # A cache miss checked out a connection; end its transaction so the connection goes back to
+    # the pool while the handler waits for a threadpool slot. The handler's first query takes one again.
+    if session.in_transaction():
+        session.rollback()
+    return caller
+
+
+async def get_caller_async(
+    x_user_id: int = Header(..., alias="X-User-ID"),
+    session: AsyncSession = Depends(get_async_session)
+) -> Optional[Caller]:
+    """`get_caller` for the async routers."""
+    caller = await identity_cache.resolve_async(session, x_user_id)
+    if session.in_transaction():
+        await session.rollback()
+    return caller
@@ -0,0 +1,189 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app.slow_requests")
+
+# Latency histogram bucket bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests slower than this are logged with their SQL; unset disables the log
+SLOW_REQUEST_MS = float(os.environ["SLOW_REQUEST_MS"]) if os.getenv("SLOW_REQUEST_MS") else None
+# Statements kept per request for the slow log
+SLOW_LOG_MAX_STATEMENTS = 50
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestStats:
+    """What one request spent on the database; filled in by the engine events."""
+    statements: int = 0
+    db_seconds: float = 0.0
+    # (sql, seconds), only collected while the slow log is enabled
+    queries: Optional[List[Tuple[str, float]]] = None
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats.statements += 1
+    stats.db_seconds += elapsed
+    if stats.queries is not None and len(stats.queries) < SLOW_LOG_MAX_STATEMENTS:
+        stats.queries.append((statement, elapsed))
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time so the pooled
+    # connection's stack does not grow and later statements pair with their own start
+    starts = context.connection.info.get("query_start_time") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Attribute every statement `engine` runs to the request it runs for. Pass `sync_engine` for async engines."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+@dataclass
+class RouteMetrics:
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    latency_sum: float = 0.0
+    statements: int = 0
+    db_seconds: float = 0.0
+    responses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class MetricsRegistry:
+    """Per-route request metrics, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = defaultdict(RouteMetrics)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            metrics = self._routes[(method, route)]
+            metrics.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.latency_sum += seconds
+            metrics.statements += stats.statements
+            metrics.db_seconds += stats.db_seconds
+            metrics.responses[status] += 1
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP http_requests_total Requests by route template and status code.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.responses.items()):
+                    lines.append(f'http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+
+            lines += [
+                "# HELP http_request_duration_seconds Request latency by route template.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), metrics in routes:
+                labels, cumulative = _labels(method, route), 0
+                for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), metrics.bucket_counts):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.latency_sum}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+            for name, attribute, kind, help_text in (
+                ("db_statements_total", "statements", "counter", "SQL statements executed by route template."),
+                ("db_time_seconds_total", "db_seconds", "counter", "Time spent in SQL statements by route template."),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for (method, route), metrics in routes:
+                    lines.append(f"{name}{{{_labels(method, route)}}} {getattr(metrics, attribute)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, SQL statement count and DB time per route template,
+    reporting them to the client in a Server-Timing header, and logging slow requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(queries=[] if SLOW_REQUEST_MS is not None else None)
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements", '
+                    f"total;dur={elapsed_ms:.2f}"
+                )
+                message.setdefault("headers", []).append((b"server-timing", timing.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            route = route.path if route is not None else UNMATCHED_ROUTE
+            registry.observe(scope["method"], route, status, elapsed, stats)
+            if SLOW_REQUEST_MS is not None and elapsed * 1000 >= SLOW_REQUEST_MS:
+                _log_slow_request(scope, route, status, elapsed, stats)
+
+
+def _log_slow_request(scope, route: str, status: int, elapsed: float, stats: RequestStats):
+    statements = "\n".join(f"  [{seconds * 1000:.2f} ms] {sql}" for sql, seconds in stats.queries)
+    logger.warning(
+        "Slow request %s %s (%s) -> %s in %.1f ms, %d statements, %.1f ms in DB\n%s",
+        scope["method"], scope["path"], route, status, elapsed * 1000, stats.statements, stats.db_seconds * 1000,
+        statements,
+    )
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import threading
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import AsyncIterator, Callable, Iterable, List, Mapping, Optional
+
+import orjson
+
+from app.models.ticket import TicketPriority, TicketStatus
+from app.models.user import UserRole
+from app.services.identity import Caller
+
+# Events buffered per subscriber; one that falls further behind is disconnected
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("TICKET_EVENTS_QUEUE_SIZE", "1000"))
+# Idle streams get an SSE comment this often, so proxies keep them open and dead clients are noticed
+KEEPALIVE_SECONDS = float(os.getenv("TICKET_EVENTS_KEEPALIVE", "15"))
+
+
+class TicketEventType(str, Enum):
+    created = "created"
+    triaged = "triaged"
+    assigned = "assigned"
+    resolved = "resolved"
+    reopened = "reopened"
+    closed = "closed"
+
+
+@dataclass(frozen=True)
+class TicketEvent:
+    """A committed ticket change: what happened, and the routing fields of the ticket after it."""
+    event: TicketEventType
+    ticket_id: int
+    status: TicketStatus
+    priority: Optional[TicketPriority]
+    assigned_team: Optional[str]
+    assignee_id: Optional[int]
+
+    @classmethod
+    def of(cls, event: TicketEventType, ticket: Mapping) -> "TicketEvent":
+        return cls(
+            event=event, ticket_id=ticket["id"], status=ticket["status"], priority=ticket.get("priority"),
+            assigned_team=ticket.get("assigned_team"), assignee_id=ticket.get("assignee_id"),
+        )
+
+
+def accepts_for(caller: Caller) -> Callable[[TicketEvent], bool]:
+    """Which events a subscriber sees: triage officers everything, agents their team's and their own tickets."""
+    if caller.role == UserRole.triage_officer:
+        return lambda event: True
+    return lambda event: event.assignee_id == caller.id or (
+        event.assigned_team is not None and event.assigned_team == caller.department
+    )
+
+
+class Subscription:
+    """One listener's bounded queue, owned by the event loop serving it. None in the queue ends the stream."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, accepts: Callable[[TicketEvent], bool], maxsize: int):
+        self.loop = loop
+        self.accepts = accepts
+        self.queue: "asyncio.Queue[Optional[TicketEvent]]" = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class TicketBroadcaster:
+    """
+    In-process fan-out of ticket events to streaming clients. Publishing never blocks the
+    writer: events are handed to each subscriber's loop, and a subscriber whose queue is
+    full is disconnected rather than waited for (it can reconnect and re-read the lists).
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._subscriptions: List[Subscription] = []
+
+    def subscribe(self, accepts: Callable[[TicketEvent], bool]) -> Subscription:
+        """Must be called on the event loop that will consume the subscription."""
+        subscription = Subscription(asyncio.get_running_loop(), accepts, self.queue_size)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event: TicketEventType, ticket: Mapping):
+        self.publish_many(event, [ticket])
+
+    def publish_many(self, event: TicketEventType, tickets: Iterable[Mapping]):
+        """Announce committed changes. Safe to call from any thread."""
+        events = [TicketEvent.of(event, ticket) for ticket in tickets]
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            wanted = [e for e in events if subscription.accepts(e)]
+            if not wanted:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(self._deliver, subscription, wanted)
+            except RuntimeError:
+                # Its loop has shut down
+                self.unsubscribe(subscription)
+
+    def _deliver(self, subscription: Subscription, events: List[TicketEvent]):
+        """Runs on the subscriber's loop."""
+        if subscription.dropped:
+            return
+        queue = subscription.queue
+        if queue.maxsize - queue.qsize() >= len(events):
+            for event in events:
+                queue.put_nowait(event)
+            return
+        # Too slow: discard the backlog and end the stream
+        subscription.dropped = True
+        self.unsubscribe(subscription)
+        with self._lock:
+            self.dropped += 1
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"subscribers": len(self._subscriptions), "dropped": self.dropped}
+
+
+def format_event(event: TicketEvent) -> bytes:
+    return b"event: " + event.event.value.encode() + b"\ndata: " + orjson.dumps(asdict(event)) + b"\n\n"
+
+
+async def event_stream(
+    broadcaster: TicketBroadcaster, subscription: Subscription, keepalive: float = KEEPALIVE_SECONDS,
+) -> AsyncIterator[bytes]:
+    """Server-Sent Events for a subscription, until the client goes away or is dropped."""
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            yield format_event(event)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+ticket_events = TicketBroadcaster()
@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Callable, Collection, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import case, insert, select, update
+from sqlmodel import Session
+
+from app.models.ticket import Ticket, TicketPriority
+from app.models.ticket_archive import TicketArchive
+
+# Rows per INSERT statement when the dialect cannot return ids from an executemany
+INSERT_CHUNK_SIZE = 500
+# Dialects with SELECT ... FOR UPDATE SKIP LOCKED, whose native ENUMs also sort in declaration order
+SKIP_LOCKED_DIALECTS = ("mysql", "postgresql")
+# Candidates `claim_next` tries without SKIP LOCKED before reporting contention
+CLAIM_ATTEMPTS = 3
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(TicketPriority)}
+
+# (predicate on the current ticket, HTTP status, detail) - first predicate that holds explains the failure
+FailureCheck = Tuple[Callable[[Ticket], bool], int, str]
+
+
+def transition(session: Session, ticket_id: int, conditions: Iterable, values: dict) -> Optional[dict]:
+    """
+    Compare-and-set: apply `values` to the ticket only if it still matches `conditions`,
+    as a single UPDATE. Returns the updated row, or None when nothing matched.
+    Dialects with UPDATE ... RETURNING get the new row back without a follow-up SELECT.
+    The caller commits.
+    """
+    table = Ticket.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == ticket_id, *conditions)
+        .values(updated_at=datetime.utcnow(), **values)
+    )
+    if session.get_bind().dialect.update_returning:
+        row = session.execute(statement.returning(*table.c)).mappings().first()
+        return dict(row) if row is not None else None
+
+    if session.execute(statement).rowcount == 0:
+        return None
+    return dict(session.execute(select(*table.c).where(table.c.id == ticket_id)).mappings().one())
+
+
+def transition_many(session: Session, ticket_ids: Collection[int], conditions: Iterable, values: dict) -> Set[int]:
+    """
+    Set-based `transition`: one UPDATE for all `ticket_ids` that still match `conditions`.
+    A value given as a dict {ticket_id: value} is applied per ticket via CASE.
+    Returns the ids that were updated. The caller commits.
+    """
+    table = Ticket.__table__
+    conditions = [table.c.id.in_(ticket_ids), *conditions]
+    assignments = {
+        column: case(value, value=table.c.id) if isinstance(value, dict) else value
+        for column, value in values.items()
+    }
+    statement = update(table).where(*conditions).values(updated_at=datetime.utcnow(), **assignments)
+    if session.get_bind().dialect.update_returning:
+        return set(session.execute(statement.returning(table.c.id)).scalars())
+
+    # Lock the matching rows first, so they are exactly the rows the UPDATE changes
+    matched = set(session.execute(select(table.c.id).where(*conditions).with_for_update()).scalars())
+    if matched:
+        session.execute(statement)
+    return matched
+
+
+def claim_next(session: Session, conditions: List, values: dict) -> Optional[dict]:
+    """
+    Apply `values` to the most urgent ticket matching `conditions` (highest priority, then
+    oldest) and return it, or None if none matches. Concurrent claimers never get the same
+    ticket. The caller commits.
+    With SKIP LOCKED the candidate is locked and tickets held by other claimers are passed
+    over, so claims do not queue behind one another. Elsewhere each candidate is taken with a
+    `transition` on the same conditions, trying the next one if another claimer got there first.
+    """
+    table = Ticket.__table__
+    skip_locked = session.get_bind().dialect.name in SKIP_LOCKED_DIALECTS
+    # Native ENUM order is declaration order, so the index on priority serves the sort
+    priority = table.c.priority if skip_locked else case(
+        *((table.c.priority == p, rank) for p, rank in PRIORITY_RANK.items()), else_=len(PRIORITY_RANK),
+    )
+    candidate = select(table.c.id).where(*conditions).order_by(priority, table.c.created_at, table.c.id).limit(1)
+
+    if skip_locked:
+        ticket_id = session.execute(candidate.with_for_update(skip_locked=True)).scalar()
+        return None if ticket_id is None else transition(session, ticket_id, [], values)
+
+    for _ in range(CLAIM_ATTEMPTS):
+        ticket_id = session.execute(candidate).scalar()
+        if ticket_id is None:
+            return None
+        ticket = transition(session, ticket_id, conditions, values)
+        if ticket is not None:
+            return ticket
+    raise HTTPException(status_code=409, detail="Too many concurrent claims, please retry")
+
+
+def raise_for_failed_transition(
+    session: Session,
+    ticket_id: int,
+    checks: Iterable[FailureCheck],
+    not_found: Tuple[int, str] = (404, "Ticket not found"),
+):
+    """
+    Slow path after `transition` matched nothing: load the ticket once and raise the
+    HTTPException for the first failing check. If every check passes, the ticket
+    changed underneath us between the UPDATE and this read. Archived tickets are a 409:
+    they can still be read, but no longer change.
+    """
+    ticket = session.get(Ticket, ticket_id, populate_existing=True)
+    if ticket is None:
+        if session.get(TicketArchive, ticket_id) is not None:
+            raise HTTPException(status_code=409, detail="Ticket is archived and can no longer change")
+        raise HTTPException(status_code=not_found[0], detail=not_found[1])
+    for failed, status_code, detail in checks:
+        if failed(ticket):
+            raise HTTPException(status_code=status_code, detail=detail)
+    raise HTTPException(status_code=409, detail="Ticket was modified concurrently, please retry")
+
+
+def insert_tickets(session: Session, rows: List[dict]) -> List[int]:
+    """
+    Insert ticket rows in bulk and return their ids in input order. The caller commits.
+    Dialects that support it (SQLite, MariaDB) get one executemany with RETURNING.
+    The rows are one request's tickets: they share reporter_id and updated_at.
+    """
+    table = Ticket.__table__
+    dialect = session.get_bind().dialect
+    if dialect.name == "sqlite":
+        # sort_by_parameter_order needs a sentinel SQLite lacks and would run one INSERT per row.
+        # Each batched multi-row INSERT assigns ascending rowids in VALUES order, so sorting restores it.
+        return sorted(session.execute(insert(table).returning(table.c.id), rows).scalars())
+    if dialect.insert_executemany_returning:
+        statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        return list(session.execute(statement, rows).scalars())
+
+    # MySQL: one multi-row INSERT ... VALUES per chunk. InnoDB only promises the chunk increasing
+    # ids from lastrowid on, not consecutive ones: with innodb_autoinc_lock_mode=2 (the default
+    # since 8.0) concurrent inserts can interleave. So the ids are read back: this reporter's rows
+    # stamped with this request's microsecond updated_at, from lastrowid on, in id (= VALUES) order.
+    ids = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        first_id = session.execute(insert(table).values(chunk)).lastrowid
+        ids.extend(session.execute(
+            select(table.c.id)
+            .where(
+                table.c.reporter_id == chunk[0]["reporter_id"],
+                table.c.updated_at == chunk[0]["updated_at"],
+                table.c.id >= first_id,
+            )
+            .order_by(table.c.id)
+            .limit(len(chunk))
+        ).scalars())
+    return ids
@@ -0,0 +1,116 @@
+"""
+Requests/sec of the sync and async read routes under many concurrent clients.
+
+    python benchmarks/bench_async_vs_sync.py --clients 200 --requests 4000
+
+Both apps run in-process behind httpx's ASGI transport against the same SQLite
+file (DATABASE_URL is ignored), so the numbers compare handler concurrency -
+the Starlette threadpool for sync routes vs. the event loop for async ones -
+rather than network or MySQL throughput. Point --database-url at a MySQL
+instance for production-like numbers.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.async_config import get_async_read_session, get_async_session, to_async_url
+from app.database.config import get_read_session, get_session
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.routes import async_user_routes, user_routes
+from app.routes.async_ticket_routes import router as async_ticket_router
+from app.routes.ticket_routes import router as ticket_router
+
+
+def seed(engine, tickets: int) -> int:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        agent = User(username="bench_agent", email="bench_agent@example.com", role="agent", department="IT")
+        employee = User(username="bench_emp", email="bench_emp@example.com", role="employee", department="N/A")
+        session.add_all([agent, employee])
+        session.commit()
+        session.add_all(Ticket(subject=f"Bench {i}", description="x" * 200, reporter_id=employee.id) for i in range(tickets))
+        session.commit()
+        return agent.id
+
+
+def build_app(database_url: str, use_async: bool, pool_size: int) -> FastAPI:
+    # A sync request keeps its session's connection while it waits for a threadpool slot to
+    # serialize the response, so a pool smaller than the number of in-flight requests can
+    # deadlock against the 40 worker threads. Size both pools to the client count.
+    sync_engine = create_engine(database_url, pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(to_async_url(database_url), pool_size=pool_size, max_overflow=0)
+
+    def override_get_session():
+        with Session(sync_engine) as session:
+            yield session
+
+    async def override_get_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    if use_async:
+        app.include_router(async_user_routes.router)
+        app.include_router(async_ticket_router)
+    app.include_router(user_routes.router)
+    app.include_router(ticket_router)
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_async_read_session] = override_get_async_session
+    return app, async_engine
+
+
+async def run(app: FastAPI, async_engine, agent_id: int, clients: int, total: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"X-User-ID": str(agent_id)}
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/tickets/", params={"limit": 50}, headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    # aiosqlite connections own non-daemon threads; close them on this loop
+    await async_engine.dispose()
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        agent_id = seed(create_engine(database_url), args.tickets)
+        for label, use_async in (("sync", False), ("async", True)):
+            app, async_engine = build_app(database_url, use_async, pool_size=args.clients)
+            rps = asyncio.run(run(app, async_engine, agent_id, args.clients, args.requests))
+            print(f"{label:>5}: {rps:8.1f} req/s  ({args.clients} concurrent clients, {args.requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Auto-assignment (triage/assign with auto_assign=true) with thousands of agents and tickets.
+
+    python benchmarks/bench_auto_assign.py --agents 5000 --teams 50 --tickets 200000
+
+Seeds a temporary SQLite file (or --database-url) with agents and open tickets, then
+  * times seeding the balancer (the one query run at startup),
+  * simulates a stream of triages and resolutions against it, timing each pick, and
+  * times the alternative it replaces: one COUNT/GROUP BY query per pick.
+Reports the spread of agent loads within each team at the end of the simulation.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import and_, case, func, insert, select
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User, UserRole
+from app.services.agent_load import OPEN_STATUSES, PRIORITY_WEIGHTS, AgentLoadBalancer
+
+PRIORITIES = list(TicketPriority)
+
+
+def seed(session: Session, agents: int, teams: int, tickets: int, rng: random.Random):
+    session.execute(insert(User.__table__), [
+        {"id": i + 1, "username": f"agent{i}", "email": f"agent{i}@example.com",
+         "role": UserRole.agent.name, "department": f"team{i % teams}"}
+        for i in range(agents)
+    ])
+    for offset in range(0, tickets, 50000):
+        session.execute(insert(Ticket.__table__), [
+            {"subject": "Synthetic", "reporter_id": 0, "status": TicketStatus.in_progress.name,
+             "priority": rng.choice(PRIORITIES).name, "assignee_id": rng.randint(1, agents)}
+            for _ in range(min(50000, tickets - offset))
+        ])
+    session.commit()
+
+
+def least_loaded_query(team: str):
+    """What a pick costs without the balancer: aggregate the team's open tickets on every call."""
+    weight = case(
+        (Ticket.id.is_(None), 0),
+        *((Ticket.priority == priority, w) for priority, w in PRIORITY_WEIGHTS.items()),
+        else_=1,
+    )
+    load = func.coalesce(func.sum(weight), 0)
+    return (
+        select(User.id, load)
+        .select_from(User)
+        .outerjoin(Ticket, and_(Ticket.assignee_id == User.id, Ticket.status.in_(OPEN_STATUSES)))
+        .where(User.role == UserRole.agent, User.department == team)
+        .group_by(User.id)
+        .order_by(load, User.id)
+        .limit(1)
+    )
+
+
+def percentile(samples, p):
+    return statistics.quantiles(samples, n=100)[p - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=5000)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--tickets", type=int, default=200000, help="open tickets at the start")
+    parser.add_argument("--events", type=int, default=200000, help="triages and resolutions to simulate")
+    parser.add_argument("--query-picks", type=int, default=200, help="picks timed with the per-call query")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            seed(session, args.agents, args.teams, args.tickets, rng)
+
+            balancer = AgentLoadBalancer()
+            start = time.perf_counter()
+            balancer.seed(session)
+            seed_seconds = time.perf_counter() - start
+
+            # Triage new tickets onto the least loaded agent, or resolve an open one, at random
+            open_tickets = list(session.exec(select(Ticket.id)).scalars())
+            next_id, pick_times = max(open_tickets, default=0) + 1, []
+            for _ in range(args.events):
+                if open_tickets and rng.random() < 0.5:
+                    balancer.unassigned(open_tickets.pop(rng.randrange(len(open_tickets))))
+                    continue
+                team = f"team{rng.randrange(args.teams)}"
+                start = time.perf_counter()
+                balancer.reserve(session, team, next_id, rng.choice(PRIORITIES))
+                pick_times.append(time.perf_counter() - start)
+                open_tickets.append(next_id)
+                next_id += 1
+
+            query_times = []
+            for _ in range(args.query_picks):
+                start = time.perf_counter()
+                session.exec(least_loaded_query(f"team{rng.randrange(args.teams)}")).first()
+                query_times.append(time.perf_counter() - start)
+
+        spreads = [max(loads.values()) - min(loads.values())
+                   for loads in (balancer.loads(f"team{t}") for t in range(args.teams)) if loads]
+        print(f"  {args.agents} agents in {args.teams} teams, {args.tickets} open tickets, {args.events} events")
+        print(f"  seed (one query):     {seed_seconds * 1000:10.1f} ms")
+        print(f"  heap pick:            {statistics.mean(pick_times) * 1e6:10.1f} us mean, "
+              f"{percentile(pick_times, 99) * 1e6:.1f} us p99  ({len(pick_times)} picks)")
+        print(f"  COUNT query per pick: {statistics.mean(query_times) * 1e6:10.1f} us mean, "
+              f"{percentile(query_times, 99) * 1e6:.1f} us p99  ({len(query_times)} picks)")
+        print(f"  load spread per team: max {max(spreads)}, mean {statistics.mean(spreads):.1f} (weighted tickets)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
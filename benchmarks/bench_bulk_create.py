@@ -0,0 +1,63 @@
+"""
+Per-ticket cost of POST /tickets/ one at a time vs. one POST /tickets/bulk.
+
+    python benchmarks/bench_bulk_create.py --tickets 500
+
+Runs the app in-process against a temporary SQLite file (or --database-url).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.database.config import get_read_session, get_session
+from main import app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+
+        def override_get_session():
+            with Session(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = override_get_session
+        app.dependency_overrides[get_read_session] = override_get_session
+        client = TestClient(app)
+        emp_id = client.post("/users/", json={
+            "username": "bench_monitor", "email": "bench_monitor@example.com", "role": "employee"
+        }).json()["id"]
+        headers = {"X-User-ID": str(emp_id)}
+        payload = [{"subject": f"Alert {i}", "description": "host unreachable"} for i in range(args.tickets)]
+
+        start = time.perf_counter()
+        for item in payload:
+            client.post("/tickets/", json=item, headers=headers).raise_for_status()
+        single = (time.perf_counter() - start) / args.tickets
+
+        start = time.perf_counter()
+        client.post("/tickets/bulk", json=payload, headers=headers).raise_for_status()
+        bulk = (time.perf_counter() - start) / args.tickets
+
+        print(f"single: {single * 1000:7.3f} ms/ticket")
+        print(f"  bulk: {bulk * 1000:7.3f} ms/ticket  ({single / bulk:.1f}x faster, {args.tickets} tickets)")
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
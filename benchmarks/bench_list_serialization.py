@@ -0,0 +1,91 @@
+"""
+Cost of answering a ticket list, per 10k tickets: the response_model path (ORM objects
+validated into TicketRead, dumped to JSON-ready data, then json.dumps - what FastAPI does)
+vs. the column-tuple + orjson path the list endpoints use.
+
+    python benchmarks/bench_list_serialization.py --tickets 10000 --repeat 5
+
+Both paths include fetching the rows from a temporary SQLite file (or --database-url).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.ticket import Ticket, TicketPriority, TicketRead, TicketStatus
+from app.routes.pagination import json_page
+from app.routes.ticket_queries import all_tickets_query
+
+TICKET_LIST = TypeAdapter(List[TicketRead])
+
+
+def response_model_path(session: Session) -> bytes:
+    tickets = session.exec(select(Ticket).order_by(Ticket.id)).all()
+    content = TICKET_LIST.dump_python(TICKET_LIST.validate_python(tickets, from_attributes=True), mode="json")
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+    session.expunge_all()
+    return body
+
+
+def column_path(session: Session) -> bytes:
+    rows = session.execute(all_tickets_query().order_by(Ticket.id)).all()
+    return json_page(rows, Response()).body
+
+
+def timed(path, session: Session, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path(session)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            session.execute(insert(Ticket.__table__), [
+                {
+                    "subject": f"Ticket {i}", "description": "Laptop will not boot after the update",
+                    "reporter_id": 1 + i % 100, "status": TicketStatus.triaged.name,
+                    "priority": list(TicketPriority)[i % 4].name, "assigned_team": "IT",
+                    "created_at": now, "updated_at": now,
+                }
+                for i in range(args.tickets)
+            ])
+            session.commit()
+
+            assert json.loads(response_model_path(session)) == json.loads(column_path(session))
+            before = timed(response_model_path, session, args.repeat)
+            after = timed(column_path, session, args.repeat)
+
+        per_10k = 10000 / args.tickets * 1000
+        print(f"response_model: {before * per_10k:8.1f} ms per 10k tickets")
+        print(f"columns+orjson: {after * per_10k:8.1f} ms per 10k tickets  ({before / after:.1f}x faster)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time to build the SLA report (GET /tickets/sla) over a large ticket table.
+
+    python benchmarks/bench_sla_report.py --tickets 1000000
+
+Seeds a temporary SQLite file (or --database-url) with synthetic tickets, then times
+the column fetch and the NumPy aggregation separately.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import numpy as np
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User, UserRole
+from app.services import analytics
+
+
+def seed(session: Session, tickets: int):
+    rng = np.random.default_rng(0)
+    session.execute(insert(User.__table__), [
+        {"username": f"agent{i}", "email": f"agent{i}@example.com", "role": UserRole.agent.name} for i in range(50)
+    ])
+    now = datetime.utcnow()
+    priorities = list(TicketPriority)
+    teams = ["IT", "HR", "Facilities", "Finance"]
+    for offset in range(0, tickets, 50000):
+        n = min(50000, tickets - offset)
+        ages = rng.exponential(7 * 86400, n)
+        resolve_after = rng.exponential(86400, n)
+        resolved = resolve_after < ages
+        session.execute(insert(Ticket.__table__), [
+            {
+                "subject": "Synthetic", "reporter_id": 1,
+                "status": (TicketStatus.resolved if resolved[i] else TicketStatus.in_progress).name,
+                "priority": priorities[i % 4].name, "assigned_team": teams[i % 4], "assignee_id": 1 + i % 50,
+                "created_at": now - timedelta(seconds=float(ages[i])),
+                "updated_at": now,
+                "resolved_at": now - timedelta(seconds=float(ages[i] - resolve_after[i])) if resolved[i] else None,
+            }
+            for i in range(n)
+        ])
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=1000000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            seed(session, args.tickets)
+
+            start = time.perf_counter()
+            rows = len(analytics.load_report_table(session, datetime.utcnow())[0])
+            fetch = time.perf_counter() - start
+
+            start = time.perf_counter()
+            report = analytics.sla_report(session)
+            total = time.perf_counter() - start
+
+        overall = report["resolution_seconds"]["overall"]
+        print(f"  fetch: {fetch * 1000:8.1f} ms  ({rows} rows)")
+        print(f"  numpy: {(total - fetch) * 1000:8.1f} ms")
+        print(f"  total: {total * 1000:8.1f} ms  (p50 resolution {overall['p50'] / 3600:.1f} h)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
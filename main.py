@@ -1,17 +1,49 @@
+import os
 from fastapi import FastAPI
-from app.database.config import create_db_and_tables
-from app.routes import user_routes
+from fastapi.middleware.gzip import GZipMiddleware
+from app.database.async_config import DATABASE_ASYNC, dispose_async_engine
+from sqlmodel import Session
+from app.database.config import create_db_and_tables, engine, env_flag
+from app.routes import async_user_routes, user_routes
+from app.routes.async_ticket_routes import router as async_ticket_router
 from app.routes.ticket_routes import router as ticket_router
+from app.routes.ops_routes import router as ops_router
+from app.services.agent_load import agent_load
+from app.services.audit_log import audit_log
+from app.services.metrics import MetricsMiddleware
 
 app = FastAPI()
 
+if env_flag("RESPONSE_GZIP", False):
+    # Only bodies above the threshold, and only for clients sending Accept-Encoding: gzip
+    app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1000")))
+# Added last so it is outermost and times everything below it
+app.add_middleware(MetricsMiddleware)
+
+if DATABASE_ASYNC:
+    # Async read routes are matched first; everything else falls through to the sync routers
+    app.include_router(async_user_routes.router)
+    app.include_router(async_ticket_router)
+
 app.include_router(user_routes.router)
 app.include_router(ticket_router)
+app.include_router(ops_router)
 
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    with Session(engine) as session:
+        agent_load.seed(session)
+    agent_load.start(engine)
+    audit_log.start(engine)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Write out queued audit events before the process exits
+    audit_log.stop()
+    agent_load.stop()
+    await dispose_async_engine()
 
 @app.get("/")
 def read_root():
-    return {"message": "Ticketing System API is up!"}
\ No newline at end of file
+    return {"message": "Ticketing System API is up!"}
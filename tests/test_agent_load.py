@@ -0,0 +1,88 @@
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlmodel import Session, SQLModel
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.user import User, UserRole
+from app.services.agent_load import AgentLoadBalancer
+
+
+def seeded_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'load.db'}")
+    SQLModel.metadata.create_all(engine)
+    session = Session(engine)
+    session.execute(insert(User.__table__), [
+        {"id": 1, "username": "a1", "email": "a1@example.com", "role": UserRole.agent.name, "department": "IT"},
+        {"id": 2, "username": "a2", "email": "a2@example.com", "role": UserRole.agent.name, "department": "IT"},
+        {"id": 3, "username": "a3", "email": "a3@example.com", "role": UserRole.agent.name, "department": "HR"},
+        {"id": 4, "username": "e4", "email": "e4@example.com", "role": UserRole.employee.name, "department": "IT"},
+    ])
+    session.execute(insert(Ticket.__table__), [
+        {"subject": "open", "reporter_id": 4, "assignee_id": 1, "status": TicketStatus.in_progress.name,
+         "priority": TicketPriority.high.name},
+        {"subject": "open", "reporter_id": 4, "assignee_id": 2, "status": TicketStatus.triaged.name,
+         "priority": TicketPriority.low.name},
+        {"subject": "done", "reporter_id": 4, "assignee_id": 2, "status": TicketStatus.resolved.name,
+         "priority": TicketPriority.critical.name},
+    ])
+    session.commit()
+    return session
+
+
+def test_seed_weights_open_tickets_by_priority(tmp_path):
+    session = seeded_session(tmp_path)
+    balancer = AgentLoadBalancer()
+    balancer.seed(session)
+    assert balancer.loads("IT") == {1: 4, 2: 1}
+    assert balancer.loads("HR") == {3: 0}
+    assert balancer.pick(session, "IT") == 2
+    assert balancer.pick(session, "Facilities") is None
+
+
+def test_reserve_spreads_tickets_and_tracks_changes(tmp_path):
+    session = seeded_session(tmp_path)
+    balancer = AgentLoadBalancer()
+    balancer.seed(session)
+
+    picks = [balancer.reserve(session, "IT", ticket_id, TicketPriority.medium) for ticket_id in (10, 11, 12)]
+    # 2 -> 3, then 2 again (3 < 4), then 1 (4 < 5)
+    assert picks == [2, 2, 1]
+    assert balancer.loads("IT") == {1: 6, 2: 5}
+
+    # Reassigning moves the ticket's weight; resolving (or a failed assignment) releases it
+    balancer.assigned(10, 1, TicketPriority.medium)
+    assert balancer.loads("IT") == {1: 8, 2: 3}
+    balancer.unassigned(10)
+    balancer.unassigned(1)
+    assert balancer.loads("IT") == {1: 2, 2: 3}
+    assert balancer.pick(session, "IT") == 1
+    balancer.add_agent(5, "IT")
+    assert balancer.pick(session, "IT") == 5
+
+    # Stale heap entries are compacted away rather than piling up
+    for _ in range(1000):
+        balancer.assigned(99, 5, TicketPriority.low)
+        balancer.unassigned(99)
+    assert len(balancer._heaps["IT"]) <= 2 * 4 + 64 + 1
+    assert balancer.pick(session, "IT") == 5
+
+
+def test_reseeds_in_the_background_not_in_picks(tmp_path):
+    session = seeded_session(tmp_path)
+    balancer = AgentLoadBalancer(reseed_seconds=0.01)
+    balancer.seed(session)
+    balancer.assigned(50, 2, TicketPriority.critical)
+    # Picks never query once seeded, however stale the loads are
+    assert balancer.pick(None, "IT") == 1
+
+    balancer.start(session.get_bind())
+    try:
+        deadline = time.monotonic() + 5
+        while balancer.loads("IT") != {1: 4, 2: 1} and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        balancer.stop()
+    # The timer reloaded the loads from the database, dropping the in-memory charge
+    assert balancer.loads("IT") == {1: 4, 2: 1}
+    assert balancer.pick(None, "IT") == 2
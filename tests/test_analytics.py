@@ -0,0 +1,25 @@
+import numpy as np
+
+from app.services.analytics import NONE_CODE, _factorize, _grouped_summaries
+
+
+def test_grouped_summaries_match_numpy_percentile():
+    rng = np.random.default_rng(0)
+    teams = ["HR", "IT", "Ops"]
+    keys = rng.choice([0, 1, 2, NONE_CODE], size=1000)
+    values = rng.exponential(3600, size=1000)
+    labels, codes = _factorize(keys, teams)
+    assert labels == ["none", "HR", "IT", "Ops"]
+    assert _factorize(np.array([7, NONE_CODE, 7]))[0] == ["none", "7"]
+
+    order = np.argsort(values)
+    summaries = _grouped_summaries(labels, codes[order], values[order])
+    for key, label in zip((NONE_CODE, 0, 1, 2), labels):
+        expected = np.percentile(values[keys == key], [50, 90, 99])
+        stats = summaries[label]
+        assert stats["count"] == (keys == key).sum()
+        assert np.allclose([stats["p50"], stats["p90"], stats["p99"]], expected)
+
+    # Groups with no values in this subset are left out
+    subset = codes[order] != 0
+    assert set(_grouped_summaries(labels, codes[order][subset], values[order][subset])) == {"HR", "IT", "Ops"}
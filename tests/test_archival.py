@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, insert, inspect, text
+from sqlmodel import Session, SQLModel, select
+
+from app.database.fulltext import ticket_search_query
+from app.database.migrations import upgrade
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.models.ticket_archive import TicketArchive
+from app.services.archival import archive_batch, archive_closed_tickets
+from app.services.counters import read_counters, rebuild_counters
+
+NOW = datetime(2024, 6, 1)
+
+
+def add_ticket(session, status, closed_days_ago, **values):
+    session.add(Ticket(
+        subject="Archival", reporter_id=1, status=status, priority=TicketPriority.low, assigned_team="IT",
+        created_at=NOW - timedelta(days=200), updated_at=NOW - timedelta(days=closed_days_ago), **values,
+    ))
+
+
+def test_archives_old_closed_tickets_in_batches(db_session):
+    for i in range(5):
+        add_ticket(db_session, TicketStatus.closed, 100 + i, resolution_notes=f"note {i}")
+    add_ticket(db_session, TicketStatus.closed, 10)  # closed too recently
+    add_ticket(db_session, TicketStatus.resolved, 100)  # not closed
+    db_session.commit()
+    rebuild_counters(db_session)
+
+    cutoff = NOW - timedelta(days=90)
+    assert archive_batch(db_session, cutoff, batch_size=2) == 2
+    assert archive_closed_tickets(db_session, days=90, batch_size=2, now=NOW) == 3
+    assert archive_closed_tickets(db_session, days=90, batch_size=2, now=NOW) == 0
+
+    live = db_session.exec(select(Ticket.id, Ticket.status).order_by(Ticket.id)).all()
+    assert [tuple(row) for row in live] == [(6, TicketStatus.closed), (7, TicketStatus.resolved)]
+    archived = db_session.exec(select(TicketArchive).order_by(TicketArchive.id)).all()
+    assert [t.id for t in archived] == [1, 2, 3, 4, 5]
+    assert [t.resolution_notes for t in archived] == [f"note {i}" for i in range(5)]
+    assert archived[0].updated_at == NOW - timedelta(days=100)
+    assert all(t.archived_at is not None for t in archived)
+
+    # The counters were kept in step, so a full recount of the live table agrees
+    counted = read_counters(db_session)
+    assert counted["status"]["closed"] == 1
+    rebuild_counters(db_session)
+    assert read_counters(db_session) == counted
+
+
+def test_archived_ids_are_never_handed_out_again(db_session):
+    for days in (100, 100, 100):
+        add_ticket(db_session, TicketStatus.closed, days)
+    db_session.commit()
+
+    # The newest ticket stays live, keeping MAX(ticket.id) above the archive
+    assert archive_closed_tickets(db_session, days=90, now=NOW) == 2
+    assert db_session.exec(select(Ticket.id)).all() == [3]
+
+    # Even with the live table emptied, new tickets get fresh ids
+    db_session.exec(delete(Ticket))
+    db_session.commit()
+    add_ticket(db_session, TicketStatus.new, 0)
+    db_session.commit()
+    assert db_session.exec(select(Ticket.id)).all() == [4]
+
+
+def test_upgrade_adds_autoincrement_to_old_sqlite_ticket_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # A ticket table as created before sqlite_autoincrement, with ticket 2 already archived
+        connection.exec_driver_sql("DROP TABLE ticket")
+        Ticket.__table__.dialect_options["sqlite"]["autoincrement"] = False
+        try:
+            Ticket.__table__.create(connection)
+        finally:
+            Ticket.__table__.dialect_options["sqlite"]["autoincrement"] = True
+        connection.execute(insert(Ticket.__table__), [
+            {"id": 1, "subject": "printer on fire", "reporter_id": 1, "status": TicketStatus.new.name},
+        ])
+        connection.execute(insert(TicketArchive.__table__), [
+            {"id": 2, "subject": "Archived", "reporter_id": 1, "status": TicketStatus.closed.name,
+             "created_at": NOW, "updated_at": NOW},
+        ])
+
+    upgrade(engine)
+    upgrade(engine)
+
+    with Session(engine) as session:
+        ddl = session.exec(text("SELECT sql FROM sqlite_master WHERE name = 'ticket'")).scalar()
+        assert "AUTOINCREMENT" in ddl
+        session.add(Ticket(subject="After the upgrade", reporter_id=1))
+        session.commit()
+        assert session.exec(select(Ticket.id).order_by(Ticket.id)).all() == [1, 3]
+        # Indexes and full-text search came through the rebuild
+        assert "ix_ticket_status" in {ix["name"] for ix in inspect(engine).get_indexes("ticket")}
+        statement, _ = ticket_search_query("sqlite", "printer")
+        assert [row.id for row in session.execute(statement)] == [1]
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.async_config import get_async_read_session, get_async_session, to_async_url
+from app.database.config import get_read_engine, get_read_session, get_session
+from app.routes import async_user_routes, user_routes
+from app.routes.async_ticket_routes import router as async_ticket_router
+from app.routes.ticket_routes import router as ticket_router
+from app.services.identity import identity_cache
+
+pytest.importorskip("aiosqlite")
+
+
+def test_to_async_url():
+    assert to_async_url("mysql+pymysql://u:p@db:3306/ticketing") == "mysql+aiomysql://u:p@db:3306/ticketing"
+    assert to_async_url("sqlite:///./local.db") == "sqlite+aiosqlite:///./local.db"
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """App wired like DATABASE_ASYNC=true, with sync and async engines on one SQLite file."""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    SQLModel.metadata.create_all(sync_engine)
+    async_engine = create_async_engine(to_async_url(url))
+
+    def override_get_session():
+        with Session(sync_engine) as session:
+            yield session
+
+    async def override_get_async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(async_user_routes.router)
+    app.include_router(async_ticket_router)
+    app.include_router(user_routes.router)
+    app.include_router(ticket_router)
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    app.dependency_overrides[get_read_engine] = lambda: sync_engine
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_async_read_session] = override_get_async_session
+    identity_cache.clear()
+    with TestClient(app) as c:
+        yield c
+        c.portal.call(async_engine.dispose)
+    identity_cache.clear()
+
+
+def test_async_read_routes(async_client):
+    emp_id = async_client.post("/users/", json={
+        "username": "async_emp", "email": "async_emp@example.com", "role": "employee"
+    }).json()["id"]
+    agent_id = async_client.post("/users/", json={
+        "username": "async_agent", "email": "async_agent@example.com", "role": "agent", "department": "IT"
+    }).json()["id"]
+    for i in range(3):
+        resp = async_client.post("/tickets/", json={"subject": f"Async {i}"}, headers={"X-User-ID": str(emp_id)})
+        assert resp.status_code == 201, resp.json()
+
+    resp = async_client.get("/tickets/my", params={"limit": 2}, headers={"X-User-ID": str(emp_id)})
+    assert resp.status_code == 200, resp.json()
+    assert [t["subject"] for t in resp.json()] == ["Async 0", "Async 1"]
+    resp = async_client.get(
+        "/tickets/my", params={"limit": 2, "cursor": resp.headers["X-Next-Cursor"]}, headers={"X-User-ID": str(emp_id)}
+    )
+    assert [t["subject"] for t in resp.json()] == ["Async 2"]
+
+    ticket_id = resp.json()[0]["id"]
+    assert async_client.get(f"/tickets/{ticket_id}", headers={"X-User-ID": str(agent_id)}).status_code == 200
+    assert async_client.get("/tickets/", params={"status": "new"}, headers={"X-User-ID": str(agent_id)}).json()
+    assert async_client.get("/users/", headers={"X-User-ID": str(emp_id)}).status_code == 403
+    assert async_client.get(f"/users/{agent_id}", headers={"X-User-ID": str(agent_id)}).status_code == 200
+    assert async_client.get(
+        f"/tickets/{ticket_id}", params={"fields": "subject"}, headers={"X-User-ID": str(agent_id)}
+    ).json() == {"subject": "Async 2"}
+    assert async_client.get(
+        f"/users/{agent_id}", params={"fields": "id"}, headers={"X-User-ID": str(agent_id)}
+    ).json() == {"id": agent_id}
+
+    # Sync-only routes under /tickets/ are not shadowed by the async /tickets/{ticket_id:int}
+    assert async_client.get("/tickets/export", headers={"X-User-ID": str(agent_id)}).status_code == 200
@@ -0,0 +1,66 @@
+import threading
+
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+
+from app.models.ticket import TicketStatus
+from app.models.ticket_audit import TicketAuditEvent
+from app.services.audit_log import AuditLogWriter
+
+
+def ticket(ticket_id, status=TicketStatus.new):
+    return {"id": ticket_id, "status": status, "priority": None, "assigned_team": None, "assignee_id": None}
+
+
+def audit_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def logged(engine):
+    with Session(engine) as session:
+        return [tuple(row) for row in session.exec(
+            select(TicketAuditEvent.ticket_id, TicketAuditEvent.event, TicketAuditEvent.actor_id).order_by(TicketAuditEvent.id)
+        )]
+
+
+def test_events_are_written_in_batches_and_flushed_on_stop(tmp_path):
+    engine = audit_engine(tmp_path)
+    writer = AuditLogWriter(batch_size=3, flush_ms=1000)
+    writer.record_many("created", [ticket(i) for i in range(1, 6)], actor_id=7)
+    writer.record("closed", ticket(1, TicketStatus.closed), actor_id=8)
+    writer.start(engine)
+    writer.stop()
+
+    assert logged(engine) == [(i, "created", 7) for i in range(1, 6)] + [(1, "closed", 8)]
+    # Two full batches of three, written without waiting out flush_ms
+    assert writer.stats() == {
+        "running": False, "queued": 0, "capacity": writer.stats()["capacity"],
+        "enqueued": 6, "blocked": 0, "dropped": 0, "written": 6, "failed": 0, "batches": 2,
+    }
+
+
+def test_full_queue_pushes_back_then_drops(tmp_path):
+    writer = AuditLogWriter(queue_size=2, enqueue_timeout_ms=1)
+    # Not started: nothing drains the queue, so the third event waits briefly and is dropped
+    done = threading.Event()
+    threading.Thread(target=lambda: (writer.record_many("created", [ticket(i) for i in range(3)], 7), done.set())).start()
+    assert done.wait(timeout=5)
+
+    stats = writer.stats()
+    assert (stats["enqueued"], stats["blocked"], stats["dropped"], stats["queued"]) == (2, 1, 1, 2)
+
+    engine = audit_engine(tmp_path)
+    writer.start(engine)
+    writer.stop()
+    assert [row[0] for row in logged(engine)] == [0, 1]
+
+
+def test_failed_insert_is_counted_not_raised(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing.db'}")  # no tables
+    writer = AuditLogWriter(flush_ms=1)
+    writer.start(engine)
+    writer.record("created", ticket(1), actor_id=7)
+    writer.stop()
+    assert (writer.stats()["written"], writer.stats()["failed"]) == (0, 1)
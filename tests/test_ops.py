@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.database.pool import InstrumentedQueuePool, pool_status
+
+
+def test_pool_status_reports_occupancy_and_wait(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1
+    )
+    with engine.connect() as first, engine.connect() as second, engine.connect() as third:
+        for conn in (first, second, third):
+            conn.execute(text("SELECT 1"))
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 3
+        assert status["overflow"] == 1
+
+    status = pool_status(engine.pool)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 2
+    assert status["checkouts"] == 3
+    assert status["checkout_wait_seconds_total"] >= 0
+
+
+def test_pool_endpoint(client):
+    agent_id = client.post("/users/", json={
+        "username": "ops_agent", "email": "ops_agent@example.com", "role": "agent", "department": "IT"
+    }).json()["id"]
+    emp_id = client.post("/users/", json={
+        "username": "ops_emp", "email": "ops_emp@example.com", "role": "employee"
+    }).json()["id"]
+
+    response = client.get("/ops/pool", headers={"X-User-ID": str(agent_id)})
+    assert response.status_code == 200
+    assert "pool_class" in response.json()["primary"]
+    # Staff only, like the other operational endpoints
+    for path in ("/ops/pool", "/ops/identity-cache", "/ops/audit-log", "/ops/ticket-events", "/metrics"):
+        assert client.get(path, headers={"X-User-ID": str(emp_id)}).status_code == 403
+        assert client.get(path).status_code == 422
+
+
+def test_failed_statements_do_not_leave_start_times_behind(tmp_path):
+    from app.services import metrics
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'errors.db'}")
+    metrics.instrument_engine(engine)
+    stats = metrics.RequestStats()
+    token = metrics._current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(exc.OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info["query_start_time"] == []
+    finally:
+        metrics._current_request.reset(token)
+    assert stats.statements == 1
+
+
+def test_metrics_and_server_timing(client, monkeypatch, caplog):
+    from app.services import metrics
+    metrics.registry.clear()
+    user_id = client.post("/users/", json={
+        "username": "metrics_agent", "email": "metrics_agent@example.com", "role": "agent", "department": "IT"
+    }).json()["id"]
+
+    response = client.get(f"/users/{user_id}", headers={"X-User-ID": str(user_id)})
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and "total;dur=" in timing
+    assert '"0 statements"' not in timing
+
+    body = client.get("/metrics", headers={"X-User-ID": str(user_id)}).text
+    labels = 'method="GET",route="/users/{user_id}"'
+    assert f'http_requests_total{{{labels},status="200"}} 1' in body
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+    assert f"http_request_duration_seconds_count{{{labels}}} 1" in body
+    statements = [line for line in body.splitlines() if line.startswith(f"db_statements_total{{{labels}}}")]
+    assert int(statements[0].split()[-1]) >= 1
+
+    # Every request over the threshold is logged with its SQL
+    monkeypatch.setattr(metrics, "SLOW_REQUEST_MS", 0.0)
+    with caplog.at_level("WARNING", logger="app.slow_requests"):
+        client.get(f"/users/{user_id}", headers={"X-User-ID": str(user_id)})
+    assert "/users/{user_id}" in caplog.text
+    assert "SELECT" in caplog.text
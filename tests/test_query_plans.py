@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from app.models.ticket import Ticket, TicketStatus
+from app.routes.pagination import PageParams, encode_cursor, page_statement, union_page_statement
+from app.routes.ticket_queries import (
+    SortOrder, TicketFilters, TicketSortField, all_tickets_query, my_tickets_query, pending_triage_query,
+    ticket_changes_query, ticket_models,
+)
+
+CREATED_SORT = TicketFilters(
+    created_after=datetime(2024, 1, 1), sort=TicketSortField.created_at, order=SortOrder.desc,
+)
+UPDATED_SORT = TicketFilters(updated_after=datetime(2024, 1, 1), sort=TicketSortField.updated_at)
+
+# Each list route's statement as the route issues it: (query, keyset filters)
+ROUTE_QUERIES = {
+    "GET /tickets/my": (my_tickets_query(1), TicketFilters()),
+    "GET /tickets/pending-triage": (pending_triage_query(), TicketFilters()),
+    "GET /tickets/?status=": (all_tickets_query(TicketFilters(status=[TicketStatus.triaged])), TicketFilters()),
+    "GET /tickets/?assigned_team=": (all_tickets_query(TicketFilters(assigned_team="IT")), TicketFilters()),
+    "GET /tickets/?assignee_id=": (all_tickets_query(TicketFilters(assignee_id=1)), TicketFilters()),
+    "GET /tickets/?created_after=&sort=created_at": (all_tickets_query(CREATED_SORT), CREATED_SORT),
+    "GET /tickets/?updated_after=&sort=updated_at": (all_tickets_query(UPDATED_SORT), UPDATED_SORT),
+    "GET /tickets/changes": (ticket_changes_query(datetime(2024, 7, 1)), TicketFilters(sort=TicketSortField.updated_at)),
+}
+
+
+@pytest.fixture(scope="module")
+def plan_engine():
+    """Throwaway SQLite database with the production schema, used only for EXPLAIN."""
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def explain(engine, statement):
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+
+
+def cursor_for(filters):
+    values = [datetime(2024, 6, 1), 100] if len(filters.key_columns) == 2 else [100]
+    return encode_cursor(values)
+
+
+@pytest.mark.parametrize("route", ROUTE_QUERIES)
+@pytest.mark.parametrize("first_page", [True, False])
+def test_list_routes_do_not_scan_ticket_table(plan_engine, route, first_page):
+    statement, filters = ROUTE_QUERIES[route]
+    page = PageParams(cursor=None if first_page else cursor_for(filters), limit=50)
+    plan = explain(plan_engine, page_statement(statement, page, filters.key_columns, filters.descending))
+    scans = [step for step in plan if step.startswith("SCAN")]
+    assert not scans, f"{route} falls back to a full scan: {plan}"
+
+
+def test_unfiltered_next_page_seeks_by_primary_key(plan_engine):
+    page = PageParams(cursor=encode_cursor([100]), limit=50)
+    plan = explain(plan_engine, page_statement(all_tickets_query(), page, [Ticket.id]))
+    assert any("PRIMARY KEY" in step for step in plan), plan
+
+
+# include_archived=true list statements, one per table: (route, statement for a model, keyset filters)
+ARCHIVE_QUERIES = {
+    "GET /tickets/my": (lambda model: my_tickets_query(1, model), TicketFilters()),
+    "GET /tickets/?sort=created_at": (
+        lambda model: all_tickets_query(TicketFilters(sort=TicketSortField.created_at), model),
+        TicketFilters(sort=TicketSortField.created_at),
+    ),
+    "GET /tickets/?sort=updated_at&order=desc": (
+        lambda model: all_tickets_query(TicketFilters(sort=TicketSortField.updated_at, order=SortOrder.desc), model),
+        TicketFilters(sort=TicketSortField.updated_at, order=SortOrder.desc),
+    ),
+}
+
+
+@pytest.mark.parametrize("route", ARCHIVE_QUERIES)
+@pytest.mark.parametrize("first_page", [True, False])
+def test_archive_union_pages_each_table_by_index(plan_engine, route, first_page):
+    query, filters = ARCHIVE_QUERIES[route]
+    statements = [query(model) for model in ticket_models(include_archived=True)]
+    page = PageParams(cursor=None if first_page else cursor_for(filters), limit=50)
+    statement, _ = union_page_statement(statements, page, filters.key_columns, filters.descending)
+    plan = explain(plan_engine, statement)
+    # Each branch walks an index in keyset order and stops at the page size
+    reads = [step for step in plan if step.startswith(("SCAN ticket", "SEARCH ticket"))]
+    assert {step.split()[1] for step in reads} == {"ticket", "ticket_archive"}, plan
+    assert all("INDEX" in step for step in reads), f"{route} with include_archived falls back to a full scan: {plan}"
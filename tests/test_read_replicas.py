@@ -0,0 +1,166 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import async_config, config
+from app.database.replicas import RecentWriters, ReplicaSet
+from app.models.ticket import Ticket, TicketStatus
+from app.models.user import User, UserRole
+from app.routes import async_ticket_routes, async_user_routes, ops_routes, ticket_routes, user_routes
+from app.services.agent_load import agent_load
+from app.services.audit_log import AuditLogWriter
+from app.services.identity import identity_cache
+from main import app
+
+USERS = [
+    {"id": 1, "username": "emp", "email": "emp@example.com", "role": UserRole.employee.name, "department": "N/A"},
+    {"id": 2, "username": "agent", "email": "agent@example.com", "role": UserRole.agent.name, "department": "IT"},
+]
+
+
+def sqlite_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def add_ticket(engine, subject):
+    with engine.begin() as connection:
+        connection.execute(insert(Ticket.__table__), [
+            {"subject": subject, "reporter_id": 1, "status": TicketStatus.new.name},
+        ])
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """The app on a primary and two replica SQLite files, with the users replicated to all three."""
+    primary = sqlite_engine(tmp_path / "primary.db")
+    replica_engines = [sqlite_engine(tmp_path / f"replica{i}.db") for i in (1, 2)]
+    for engine in (primary, *replica_engines):
+        with engine.begin() as connection:
+            connection.execute(insert(User.__table__), USERS)
+    monkeypatch.setattr(config, "engine", primary)
+    monkeypatch.setattr(config, "replicas", ReplicaSet(replica_engines))
+    monkeypatch.setattr(config, "recent_writers", RecentWriters(window=60))
+    monkeypatch.setattr(ticket_routes, "audit_log", AuditLogWriter())
+    identity_cache.clear()
+    agent_load.clear()
+    # No startup: the schema exists and none of the background services are needed
+    yield TestClient(app), primary, replica_engines
+    identity_cache.clear()
+
+
+def test_reads_rotate_over_replicas_and_writers_read_their_writes(replicated):
+    client, primary, (replica1, replica2) = replicated
+    emp, agent = {"X-User-ID": "1"}, {"X-User-ID": "2"}
+    add_ticket(replica1, "only on replica 1")
+    add_ticket(replica2, "only on replica 2")
+
+    subjects = [[t["subject"] for t in client.get("/tickets/my", headers=emp).json()] for _ in range(4)]
+    assert subjects == [["only on replica 1"], ["only on replica 2"]] * 2
+
+    # Writes go to the primary, and the writer's own reads follow them there for a while
+    assert client.post("/tickets/", json={"subject": "written"}, headers=emp).status_code == 201
+    assert [t["subject"] for t in client.get("/tickets/my", headers=emp).json()] == ["written"]
+    assert [t["subject"] for t in client.get("/tickets/", headers=emp).json()] == ["written"]
+    # Everyone else keeps reading the replicas, which have not caught up here
+    assert "written" not in [t["subject"] for t in client.get("/tickets/", headers=agent).json()]
+
+    config.recent_writers.clear()
+    assert client.get("/tickets/my", headers=emp).json()[0]["subject"].startswith("only on replica")
+    assert [r["healthy"] for r in client.get("/ops/pool", headers=agent).json()["replicas"]] == [True, True]
+
+
+def test_export_streams_from_a_replica(replicated):
+    client, primary, (replica1, replica2) = replicated
+    agent = {"X-User-ID": "2"}
+    add_ticket(primary, "on the primary")
+    add_ticket(replica1, "only on replica 1")
+    add_ticket(replica2, "only on replica 2")
+
+    # The body streams after dependency cleanup; it must not read from an already closed connection
+    exports = []
+    for _ in range(2):
+        response = client.get("/tickets/export", headers=agent)
+        assert response.status_code == 200, response.text
+        exports.append([json.loads(line)["subject"] for line in response.text.splitlines()])
+    assert exports == [["only on replica 1"], ["only on replica 2"]]
+
+
+def test_async_routes_read_from_replicas(replicated, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    _, primary, (replica1, replica2) = replicated
+    async_primary, *async_replicas = [
+        create_async_engine(async_config.to_async_url(str(engine.url))) for engine in (primary, replica1, replica2)
+    ]
+    monkeypatch.setattr(async_config, "_async_engine", async_primary)
+    monkeypatch.setattr(async_config, "_async_session_factory", async_sessionmaker(
+        async_primary, class_=AsyncSession, expire_on_commit=False,
+    ))
+    monkeypatch.setattr(async_config, "_async_replicas", ReplicaSet(async_replicas))
+    # Wired like main.py with DATABASE_ASYNC=true
+    app = FastAPI()
+    for module in (async_user_routes, async_ticket_routes, user_routes, ticket_routes, ops_routes):
+        app.include_router(module.router)
+    emp, agent = {"X-User-ID": "1"}, {"X-User-ID": "2"}
+    add_ticket(replica1, "only on replica 1")
+    add_ticket(replica2, "only on replica 2")
+
+    with TestClient(app) as client:
+        try:
+            subjects = [[t["subject"] for t in client.get("/tickets/my", headers=emp).json()] for _ in range(2)]
+            assert subjects == [["only on replica 1"], ["only on replica 2"]]
+            assert client.get("/tickets/1", headers=agent).json()["subject"] == "only on replica 1"
+            assert client.get("/users/2", headers=agent).status_code == 200
+
+            assert client.post("/tickets/", json={"subject": "written"}, headers=emp).status_code == 201
+            assert [t["subject"] for t in client.get("/tickets/my", headers=emp).json()] == ["written"]
+            assert "written" not in [t["subject"] for t in client.get("/tickets/", headers=agent).json()]
+            assert [r["healthy"] for r in client.get("/ops/pool", headers=agent).json()["async_replicas"]] == [True, True]
+        finally:
+            for engine in (async_primary, *async_replicas):
+                client.portal.call(engine.dispose)
+
+
+def test_unreachable_replicas_are_skipped_then_retried(replicated, tmp_path, monkeypatch):
+    client, primary, (replica1, _) = replicated
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([broken, replica1], retry_seconds=60)
+
+    connections = [replicas.connect() for _ in range(3)]
+    assert all(c.engine is replica1 for c in connections)
+    for connection in connections:
+        connection.close()
+    # Tried once, then left out until its retry time
+    assert [(r["healthy"], r["failures"]) for r in replicas.status()] == [(False, 1), (True, 0)]
+    # Once the retry time has passed it is probed again on its turn
+    with monkeypatch.context() as later:
+        later.setattr("app.database.replicas.time.monotonic", lambda: 1e12)
+        for _ in range(2):
+            replicas.connect().close()
+    assert replicas.status()[0]["failures"] == 2
+
+    # With no replica answering, reads fall back to the primary
+    add_ticket(primary, "on the primary")
+    config.replicas = ReplicaSet([broken])
+    assert [t["subject"] for t in client.get("/tickets/my", headers={"X-User-ID": "1"}).json()] == ["on the primary"]
+
+
+def test_recent_writers_expire_and_can_be_disabled(monkeypatch):
+    writers = RecentWriters(window=5, maxsize=2)
+    for caller in ("1", "2", "3"):
+        writers.note(caller)
+    assert [writers.wrote_recently(c) for c in ("1", "2", "3", None)] == [False, True, True, False]
+
+    monkeypatch.setattr("app.database.replicas.time.monotonic", lambda: 1e12)
+    assert not writers.wrote_recently("3")
+
+    disabled = RecentWriters(window=0)
+    disabled.note("1")
+    assert not disabled.wrote_recently("1")
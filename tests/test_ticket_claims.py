@@ -0,0 +1,67 @@
+import threading
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlmodel import Session
+
+from app.models.ticket import Ticket, TicketPriority, TicketStatus
+from app.services.ticket_lifecycle import claim_next
+
+AGENTS = 8
+TICKETS = 200
+
+
+def test_concurrent_claims_never_assign_a_ticket_twice(db_session):
+    engine = db_session.get_bind()
+    priorities = list(TicketPriority)
+    db_session.execute(insert(Ticket.__table__), [
+        {"subject": f"Queue {i}", "reporter_id": 1, "status": TicketStatus.triaged.name,
+         "priority": priorities[i % 4].name, "assigned_team": "IT"}
+        for i in range(TICKETS)
+    ])
+    db_session.commit()
+
+    claims = {agent_id: [] for agent_id in range(1, AGENTS + 1)}
+    errors = []
+    start = threading.Barrier(AGENTS)
+
+    def agent(agent_id):
+        conditions = [Ticket.status == TicketStatus.triaged, Ticket.assigned_team == "IT"]
+        values = {"assignee_id": agent_id, "status": TicketStatus.in_progress}
+        start.wait()
+        with Session(engine) as session:
+            while True:
+                try:
+                    ticket = claim_next(session, conditions, values)
+                except HTTPException as e:
+                    # Lost several races in a row: someone else made progress, try again
+                    assert e.status_code == 409
+                    session.rollback()
+                    continue
+                session.commit()
+                if ticket is None:
+                    return
+                claims[agent_id].append(ticket["id"])
+
+    def run(agent_id):
+        try:
+            agent(agent_id)
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(agent_id,)) for agent_id in claims]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not errors, errors
+
+    claimed = Counter(ticket_id for ids in claims.values() for ticket_id in ids)
+    assert len(claimed) == TICKETS and set(claimed.values()) == {1}
+    # Every claim stuck: each ticket belongs to the agent that was told it claimed it
+    owners = dict(db_session.exec(select(Ticket.id, Ticket.assignee_id)).all())
+    assert all(owners[ticket_id] == agent_id for agent_id, ids in claims.items() for ticket_id in ids)
+    # Each agent took its tickets in queue order
+    ranks = {ticket_id: (i % 4, i) for i, ticket_id in enumerate(sorted(owners))}
+    assert all([ranks[t] for t in ids] == sorted(ranks[t] for t in ids) for ids in claims.values())
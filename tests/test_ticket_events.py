@@ -0,0 +1,74 @@
+import asyncio
+import json
+import threading
+
+from app.models.ticket import TicketStatus
+from app.models.user import UserRole
+from app.services.identity import Caller
+from app.services.ticket_events import TicketBroadcaster, TicketEventType, accepts_for, event_stream
+
+AGENT = Caller(id=7, role=UserRole.agent, department="IT")
+TRIAGE = Caller(id=8, role=UserRole.triage_officer, department=None)
+
+
+def ticket(ticket_id, team=None, assignee_id=None, status=TicketStatus.new):
+    return {"id": ticket_id, "status": status, "priority": None, "assigned_team": team, "assignee_id": assignee_id}
+
+
+def test_subscribers_only_receive_their_events():
+    async def scenario():
+        broadcaster = TicketBroadcaster()
+        agent = broadcaster.subscribe(accepts_for(AGENT))
+        triage = broadcaster.subscribe(accepts_for(TRIAGE))
+        broadcaster.publish_many(TicketEventType.created, [ticket(1), ticket(2, team="IT"), ticket(3, assignee_id=7)])
+        broadcaster.publish(TicketEventType.triaged, ticket(4, team="HR"))
+        await asyncio.sleep(0)
+        drain = lambda s: [s.queue.get_nowait().ticket_id for _ in range(s.queue.qsize())]
+        return drain(agent), drain(triage)
+
+    assert asyncio.run(scenario()) == ([2, 3], [1, 2, 3, 4])
+
+
+def test_slow_subscriber_is_dropped_without_blocking_the_publisher():
+    async def scenario():
+        broadcaster = TicketBroadcaster(queue_size=2)
+        slow = broadcaster.subscribe(accepts_for(TRIAGE))
+        # Published from another thread, as the sync route handlers do
+        writer = threading.Thread(target=lambda: [
+            broadcaster.publish(TicketEventType.created, ticket(i)) for i in range(5)
+        ])
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        await asyncio.sleep(0.05)
+
+        chunks = [chunk async for chunk in event_stream(broadcaster, slow)]
+        return slow.dropped, broadcaster.stats(), chunks
+
+    dropped, stats, chunks = asyncio.run(scenario())
+    assert dropped
+    assert stats == {"subscribers": 0, "dropped": 1}
+    # The stream ends right after the reconnect hint; the client is expected to reconnect
+    assert chunks == [b"retry: 5000\n\n"]
+
+
+def test_event_stream_frames_events_and_keepalives():
+    async def scenario():
+        broadcaster = TicketBroadcaster()
+        subscription = broadcaster.subscribe(accepts_for(TRIAGE))
+        stream = event_stream(broadcaster, subscription, keepalive=0.01)
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        broadcaster.publish(TicketEventType.resolved, ticket(9, team="IT", assignee_id=7, status=TicketStatus.resolved))
+        chunks.append(await stream.__anext__())
+        await stream.aclose()
+        return chunks, broadcaster.stats()["subscribers"]
+
+    chunks, subscribers = asyncio.run(scenario())
+    assert chunks[:2] == [b"retry: 5000\n\n", b": keepalive\n\n"]
+    event, data = chunks[2].decode().strip().split("\n")
+    assert event == "event: resolved"
+    assert json.loads(data.removeprefix("data: ")) == {
+        "event": "resolved", "ticket_id": 9, "status": "resolved", "priority": None,
+        "assigned_team": "IT", "assignee_id": 7,
+    }
+    assert subscribers == 0
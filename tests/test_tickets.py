@@ -1,4 +1,15 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
 import pytest
+from app.services.agent_load import agent_load
+
+# Every request in this module must stay within its QUERY_BUDGETS entry (see conftest)
+pytestmark = pytest.mark.usefixtures("query_budget")
+
 
 @pytest.fixture
 def create_users_for_tickets(client):
@@ -110,4 +121,690 @@ def test_resolve_ticket_not_in_progress(client, create_users_for_tickets):
         headers={"X-User-ID": str(agent_id)}
     )
     assert resp_resolve.status_code == 400
-    assert "in progress" in resp_resolve.json()["detail"]
\ No newline at end of file
+    assert "in progress" in resp_resolve.json()["detail"]
+
+def test_get_my_tickets_paginated(client, create_users_for_tickets):
+    emp_id = create_users_for_tickets["employee"]["id"]
+    headers = {"X-User-ID": str(emp_id)}
+    for i in range(5):
+        resp = client.post("/tickets/", json={"subject": f"Paged {i}"}, headers=headers)
+        assert resp.status_code == 201, resp.json()
+
+    # Walk the pages until no next cursor is returned
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/tickets/my", params=params, headers=headers)
+        assert response.status_code == 200, response.json()
+        assert len(response.json()) <= 2
+        seen.extend(t["subject"] for t in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"Paged {i}" for i in range(5)]
+
+
+def test_get_tickets_invalid_cursor(client, create_users_for_tickets):
+    agent_id = create_users_for_tickets["agent"]["id"]
+    response = client.get("/tickets/", params={"cursor": "not-a-cursor"}, headers={"X-User-ID": str(agent_id)})
+    assert response.status_code == 400
+
+
+def test_get_all_tickets_filter_and_sort(client, create_users_for_tickets):
+    emp_id = create_users_for_tickets["employee"]["id"]
+    triage_id = create_users_for_tickets["triage"]["id"]
+    agent_id = create_users_for_tickets["agent"]["id"]
+
+    ids = []
+    for i in range(3):
+        resp = client.post("/tickets/", json={"subject": f"Filter {i}"}, headers={"X-User-ID": str(emp_id)})
+        assert resp.status_code == 201, resp.json()
+        ids.append(resp.json()["id"])
+
+    resp_triage = client.put(
+        f"/tickets/{ids[1]}/triage",
+        json={"priority": "low", "assigned_team": "IT"},
+        headers={"X-User-ID": str(triage_id)}
+    )
+    assert resp_triage.status_code == 200, resp_triage.json()
+
+    headers = {"X-User-ID": str(agent_id)}
+    response = client.get("/tickets/", params={"status": "triaged", "assigned_team": "IT"}, headers=headers)
+    assert response.status_code == 200, response.json()
+    assert [t["id"] for t in response.json()] == [ids[1]]
+
+    response = client.get("/tickets/", params={"status": ["new", "triaged"], "priority": "critical"}, headers=headers)
+    assert response.json() == []
+
+    response = client.get("/tickets/", params={"sort": "created_at", "order": "desc"}, headers=headers)
+    assert [t["id"] for t in response.json()] == ids[::-1]
+
+    # Values outside the enums are rejected before touching the database
+    response = client.get("/tickets/", params={"status": "archived"}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_export_tickets_ndjson_and_csv(client, create_users_for_tickets):
+    emp_id = create_users_for_tickets["employee"]["id"]
+    agent_id = create_users_for_tickets["agent"]["id"]
+    for i in range(3):
+        client.post("/tickets/", json={"subject": f"Export {i}"}, headers={"X-User-ID": str(emp_id)})
+
+    response = client.get("/tickets/export", headers={"X-User-ID": str(agent_id)})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["subject"] for row in lines] == ["Export 0", "Export 1", "Export 2"]
+    assert lines[0]["status"] == "new"
+
+    response = client.get("/tickets/export", params={"format": "csv"}, headers={"X-User-ID": str(agent_id)})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["status"] == "new"
+
+    # Employees cannot export
+    response = client.get("/tickets/export", headers={"X-User-ID": str(emp_id)})
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("update_returning", [True, False])
+def test_full_lifecycle_and_stale_transitions(client, db_session, create_users_for_tickets, monkeypatch, update_returning):
+    # Exercise both the UPDATE ... RETURNING path and the UPDATE + SELECT fallback
+    dialect = db_session.get_bind().dialect
+    monkeypatch.setattr(dialect, "update_returning", dialect.update_returning and update_returning)
+
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+
+    ticket_id = client.post("/tickets/", json={"subject": "Lifecycle"}, headers=emp).json()["id"]
+
+    resp = client.put(f"/tickets/{ticket_id}/triage", json={"priority": "high", "assigned_team": "IT"}, headers=triage)
+    assert resp.status_code == 200, resp.json()
+    # Triaging twice loses the race cleanly
+    resp = client.put(f"/tickets/{ticket_id}/triage", json={"priority": "low", "assigned_team": "IT"}, headers=triage)
+    assert resp.status_code == 400
+
+    resp = client.put(f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers=agent)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json()["status"] == "in_progress"
+    assert resp.json()["assignee_id"] == agent_id
+
+    resp = client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "fixed"}, headers=agent)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json()["status"] == "resolved"
+    # A second agent resolving the same ticket gets a 400, not a lost update
+    resp = client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "again"}, headers=agent)
+    assert resp.status_code == 400
+
+    resp = client.put(f"/tickets/{ticket_id}/reopen", headers=emp)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json()["status"] == "in_progress"
+
+    resp = client.put(f"/tickets/{ticket_id}/close", headers=emp)
+    assert resp.status_code == 400
+    client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "fixed again"}, headers=agent)
+    resp = client.put(f"/tickets/{ticket_id}/close", headers=emp)
+    assert resp.status_code == 200, resp.json()
+    assert resp.json()["status"] == "closed"
+
+    assert client.put("/tickets/999999/close", headers=emp).status_code == 404
+
+
+def test_bulk_create_tickets(client, create_users_for_tickets):
+    emp_id = create_users_for_tickets["employee"]["id"]
+    headers = {"X-User-ID": str(emp_id)}
+    payload = [
+        {"subject": "Disk full on db-1", "description": "95%"},
+        {"description": "missing subject"},
+        {"subject": "Disk full on db-2"},
+    ]
+    response = client.post("/tickets/bulk", json=payload, headers=headers)
+    assert response.status_code == 201, response.json()
+    result = response.json()
+    assert len(result["created_ids"]) == 2
+    assert [e["index"] for e in result["errors"]] == [1]
+    assert "subject" in result["errors"][0]["detail"]
+
+    for ticket_id, subject in zip(result["created_ids"], ["Disk full on db-1", "Disk full on db-2"]):
+        resp = client.get(f"/tickets/{ticket_id}", headers=headers)
+        assert resp.json()["subject"] == subject
+        assert resp.json()["reporter_id"] == emp_id
+
+    # Nothing valid -> nothing created
+    response = client.post("/tickets/bulk", json=[{"description": "no subject"}], headers=headers)
+    assert response.status_code == 400
+    assert response.json()["created_ids"] == []
+
+    agent_id = create_users_for_tickets["agent"]["id"]
+    response = client.post("/tickets/bulk", json=payload, headers={"X-User-ID": str(agent_id)})
+    assert response.status_code == 403
+
+
+def test_bulk_create_documents_its_item_schema(client):
+    body = client.app.openapi()["paths"]["/tickets/bulk"]["post"]["requestBody"]
+    schema = body["content"]["application/json"]["schema"]
+    assert schema["items"] == {"$ref": "#/components/schemas/TicketCreate"}
+    assert schema["maxItems"] == 1000
+
+
+@pytest.mark.parametrize("update_returning", [True, False])
+def test_bulk_triage(client, db_session, create_users_for_tickets, monkeypatch, update_returning):
+    dialect = db_session.get_bind().dialect
+    monkeypatch.setattr(dialect, "update_returning", dialect.update_returning and update_returning)
+
+    emp_id = create_users_for_tickets["employee"]["id"]
+    agent_id = create_users_for_tickets["agent"]["id"]
+    triage_id = create_users_for_tickets["triage"]["id"]
+    ids = client.post(
+        "/tickets/bulk", json=[{"subject": f"Outage {i}"} for i in range(4)], headers={"X-User-ID": str(emp_id)}
+    ).json()["created_ids"]
+
+    payload = [
+        {"ticket_id": ids[0], "priority": "critical", "assigned_team": "IT", "assignee_id": agent_id},
+        {"ticket_id": ids[1], "priority": "low", "assigned_team": "IT"},
+        {"ticket_id": ids[2], "priority": "high", "assigned_team": "HR", "assignee_id": agent_id},
+        {"ticket_id": 999999, "priority": "low", "assigned_team": "IT"},
+    ]
+    response = client.put("/tickets/bulk/triage", json=payload, headers={"X-User-ID": str(triage_id)})
+    assert response.status_code == 200, response.json()
+    outcomes = response.json()
+    assert [o["success"] for o in outcomes] == [True, True, False, False]
+    assert "team" in outcomes[2]["detail"]
+    assert "not in 'new' status" in outcomes[3]["detail"]
+
+    ticket = client.get(f"/tickets/{ids[0]}", headers={"X-User-ID": str(agent_id)}).json()
+    assert (ticket["status"], ticket["priority"], ticket["assignee_id"]) == ("triaged", "critical", agent_id)
+    ticket = client.get(f"/tickets/{ids[1]}", headers={"X-User-ID": str(agent_id)}).json()
+    assert (ticket["priority"], ticket["assignee_id"]) == ("low", None)
+
+    # Already-triaged tickets are reported, not re-triaged
+    response = client.put("/tickets/bulk/triage", json=payload[:1], headers={"X-User-ID": str(triage_id)})
+    assert response.json()[0]["success"] is False
+
+
+def test_search_tickets_ranked_paginated_and_scoped(client, create_users_for_tickets):
+    emp_id = create_users_for_tickets["employee"]["id"]
+    agent_id = create_users_for_tickets["agent"]["id"]
+    client.post("/tickets/bulk", json=[
+        {"subject": "Printer jam", "description": "The printer on floor 2 jams on every printer job"},
+        {"subject": "Printer offline", "description": "Cannot reach it"},
+        {"subject": "VPN drops", "description": "Disconnects hourly"},
+    ], headers={"X-User-ID": str(emp_id)})
+    other_emp = client.post("/users/", json={
+        "username": "search_other", "email": "search_other@example.com", "role": "employee"
+    }).json()["id"]
+
+    headers = {"X-User-ID": str(agent_id)}
+    response = client.get("/tickets/search", params={"q": "printer", "limit": 1}, headers=headers)
+    assert response.status_code == 200, response.json()
+    first = response.json()
+    assert [t["subject"] for t in first] == ["Printer jam"]  # more matches ranks higher
+    response = client.get(
+        "/tickets/search", params={"q": "printer", "limit": 1, "cursor": response.headers["X-Next-Cursor"]},
+        headers=headers
+    )
+    assert [t["subject"] for t in response.json()] == ["Printer offline"]
+    assert "X-Next-Cursor" not in response.headers
+
+    # Employees only find their own tickets
+    assert len(client.get("/tickets/search", params={"q": "printer"}, headers={"X-User-ID": str(emp_id)}).json()) == 2
+    assert client.get("/tickets/search", params={"q": "printer"}, headers={"X-User-ID": str(other_emp)}).json() == []
+
+    # Search syntax in user input is treated literally
+    response = client.get("/tickets/search", params={"q": 'vpn" OR *'}, headers=headers)
+    assert response.status_code == 200
+
+
+def test_ticket_stats_follow_lifecycle(client, db_session, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+
+    ids = client.post("/tickets/bulk", json=[{"subject": f"Stat {i}"} for i in range(3)], headers=emp).json()["created_ids"]
+    ids.append(client.post("/tickets/", json={"subject": "Stat 3"}, headers=emp).json()["id"])
+    client.put("/tickets/bulk/triage", json=[
+        {"ticket_id": ids[0], "priority": "high", "assigned_team": "IT"},
+        {"ticket_id": ids[1], "priority": "low", "assigned_team": "IT"},
+    ], headers=triage)
+    client.put(f"/tickets/{ids[2]}/triage", json={"priority": "high", "assigned_team": "HR"}, headers=triage)
+    client.put(f"/tickets/{ids[0]}/assign", json={"assignee_id": agent_id}, headers=agent)
+    client.put(f"/tickets/{ids[0]}/assign", json={"assignee_id": agent_id}, headers=agent)  # reassign: no status change
+    client.put(f"/tickets/{ids[0]}/resolve", json={"resolution_notes": "done"}, headers=agent)
+
+    response = client.get("/tickets/stats", headers=agent)
+    assert response.status_code == 200, response.json()
+    stats = response.json()
+    assert stats["status"] == {"new": 1, "triaged": 2, "in_progress": 0, "resolved": 1, "closed": 0}
+    assert stats["priority"] == {"none": 1, "low": 1, "medium": 0, "high": 2, "critical": 0}
+    assert stats["assigned_team"] == {"none": 1, "IT": 2, "HR": 1}
+
+    # A full recount agrees with the incrementally maintained counters
+    from app.services.counters import read_counters, rebuild_counters
+    rebuild_counters(db_session)
+    assert read_counters(db_session) == stats
+
+    assert client.get("/tickets/stats", headers=emp).status_code == 403
+
+
+def test_sla_report(client, db_session, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+
+    ids = client.post("/tickets/bulk", json=[{"subject": f"SLA {i}"} for i in range(3)], headers=emp).json()["created_ids"]
+    for ticket_id in ids[:2]:
+        client.put(f"/tickets/{ticket_id}/triage", json={"priority": "high", "assigned_team": "IT"}, headers=triage)
+        client.put(f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers=agent)
+        client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "done"}, headers=agent)
+
+    response = client.get("/tickets/sla", headers=agent)
+    assert response.status_code == 200, response.json()
+    report = response.json()
+    assert report["resolution_seconds"]["overall"]["count"] == 2
+    assert report["resolution_seconds"]["priority"]["high"]["count"] == 2
+    assert report["resolution_seconds"]["assignee_id"][str(agent_id)]["count"] == 2
+    assert report["resolution_seconds"]["overall"]["p50"] >= 0
+    assert report["backlog_age_seconds"]["overall"]["count"] == 1
+    assert report["backlog_age_seconds"]["assigned_team"] == {"none": report["backlog_age_seconds"]["overall"]}
+
+    # Served from cache until the TTL expires
+    client.post("/tickets/", json={"subject": "After report"}, headers=emp)
+    assert client.get("/tickets/sla", headers=agent).json() == report
+
+    # Ages are measured against the report time
+    from app.services.analytics import sla_report
+    later = sla_report(db_session, now=datetime.utcnow() + timedelta(hours=1))
+    assert later["backlog_age_seconds"]["overall"]["count"] == 2
+    assert later["backlog_age_seconds"]["overall"]["p50"] > 3500
+
+    assert client.get("/tickets/sla", headers=emp).status_code == 403
+
+
+def test_ticket_etags(client, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+    ticket_id = client.post("/tickets/", json={"subject": "Polled"}, headers=emp).json()["id"]
+
+    response = client.get(f"/tickets/{ticket_id}", headers=emp)
+    etag = response.headers["ETag"]
+    response = client.get(f"/tickets/{ticket_id}", headers={**emp, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # Revalidation still enforces access
+    other = client.post("/users/", json={"username": "etag_other", "email": "etag_other@example.com", "role": "employee"})
+    response = client.get(f"/tickets/{ticket_id}", headers={"X-User-ID": str(other.json()["id"]), "If-None-Match": etag})
+    assert response.status_code == 403
+
+    # A stale If-Match is rejected without applying the change
+    response = client.put(
+        f"/tickets/{ticket_id}/triage", json={"priority": "high", "assigned_team": "IT"},
+        headers={**triage, "If-Match": '"1-20000101000000000000"'},
+    )
+    assert response.status_code == 412
+    response = client.put(
+        f"/tickets/{ticket_id}/triage", json={"priority": "high", "assigned_team": "IT"},
+        headers={**triage, "If-Match": etag},
+    )
+    assert response.status_code == 200, response.json()
+    triaged_etag = response.headers["ETag"]
+    assert triaged_etag != etag
+
+    # The old version no longer matches, on reads or writes
+    assert client.get(f"/tickets/{ticket_id}", headers={**emp, "If-None-Match": etag}).status_code == 200
+    response = client.put(
+        f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers={**agent, "If-Match": etag}
+    )
+    assert response.status_code == 412
+    response = client.put(
+        f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers={**agent, "If-Match": triaged_etag}
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json()["status"] == "in_progress"
+    assert client.get(f"/tickets/{ticket_id}", headers=emp).headers["ETag"] == response.headers["ETag"]
+
+
+def test_list_rows_match_response_model(client, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent = {"X-User-ID": str(create_users_for_tickets["agent"]["id"])}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+    first = client.post("/tickets/", json={"subject": "Ünïcode ✓", "description": None}, headers=emp).json()["id"]
+    client.post("/tickets/", json={"subject": "Plain", "description": "text"}, headers=emp)
+    client.put(f"/tickets/{first}/triage", json={"priority": "high", "assigned_team": "IT"}, headers=triage)
+
+    listed = client.get("/tickets/", headers=agent).json()
+    assert len(listed) == 2
+    for row in listed:
+        # The detail route still goes through TicketRead; list rows must be identical, key order included
+        single = client.get(f"/tickets/{row['id']}", headers=agent).json()
+        assert list(row.items()) == list(single.items())
+    assert client.get("/tickets/my", headers=emp).json() == listed
+
+
+def test_sparse_fieldsets(client, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent = {"X-User-ID": str(create_users_for_tickets["agent"]["id"])}
+    ids = client.post("/tickets/bulk", json=[
+        {"subject": f"Sparse {i}", "description": "x" * 500} for i in range(3)
+    ], headers=emp).json()["created_ids"]
+
+    # Only the requested fields, in schema order, across pages
+    response = client.get("/tickets/", params={"fields": "status,id", "limit": 2}, headers=agent)
+    assert response.status_code == 200, response.json()
+    assert response.json() == [{"id": ids[0], "status": "new"}, {"id": ids[1], "status": "new"}]
+    response = client.get(
+        "/tickets/", params={"fields": "status", "limit": 2, "cursor": response.headers["X-Next-Cursor"]}, headers=agent
+    )
+    assert response.json() == [{"status": "new"}]
+
+    # Cursor keys are selected even when not requested
+    response = client.get(
+        "/tickets/", params={"fields": "subject", "sort": "created_at", "order": "desc", "limit": 1}, headers=agent
+    )
+    assert response.json() == [{"subject": "Sparse 2"}]
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get(f"/tickets/{ids[0]}", params={"fields": "priority,assignee_id"}, headers=emp)
+    assert response.json() == {"priority": None, "assignee_id": None}
+    assert "ETag" in response.headers
+    assert client.get("/tickets/my", params={"fields": "id"}, headers=emp).json() == [{"id": i} for i in ids]
+    response = client.get("/tickets/search", params={"q": "sparse", "fields": "id,rank"}, headers=agent)
+    assert set(response.json()[0]) == {"id", "rank"}
+
+    # Validated against the response schema
+    response = client.get("/tickets/", params={"fields": "id,resolution_notes"}, headers=agent)
+    assert response.status_code == 400
+    assert "resolution_notes" in response.json()["detail"]
+    assert client.get("/tickets/", params={"fields": ","}, headers=agent).status_code == 400
+
+
+@pytest.mark.parametrize("rows", [1, 100, 1000])
+def test_query_counts_do_not_grow_with_rows(client, create_users_for_tickets, rows):
+    """Budgets are per request, so list and bulk routes must stay within them however many rows they touch."""
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+
+    response = client.post("/tickets/bulk", json=[{"subject": f"Laptop {i}"} for i in range(rows)], headers=emp)
+    ids = response.json()["created_ids"]
+    assert len(ids) == rows
+
+    full_page = min(rows, 200)
+    assert len(client.get("/tickets/my", params={"limit": 200}, headers=emp).json()) == full_page
+    assert len(client.get("/tickets/pending-triage", params={"limit": 200}, headers=triage).json()) == full_page
+    assert len(client.get("/tickets/search", params={"q": "laptop", "limit": 200}, headers=agent).json()) == full_page
+    assert len(client.get("/tickets/export", headers=agent).text.splitlines()) == rows
+
+    response = client.put("/tickets/bulk/triage", json=[
+        {"ticket_id": ticket_id, "priority": "low", "assigned_team": "IT", "assignee_id": agent_id}
+        for ticket_id in ids
+    ], headers=triage)
+    assert all(outcome["success"] for outcome in response.json())
+
+    assert len(client.get("/tickets/", params={"limit": 200, "fields": "id,status"}, headers=agent).json()) == full_page
+    assert client.get("/tickets/stats", headers=agent).json()["status"]["triaged"] == rows
+    assert client.get("/tickets/sla", headers=agent).json()["backlog_age_seconds"]["overall"]["count"] == rows
+
+
+def test_lifecycle_publishes_ticket_events(client, create_users_for_tickets):
+    from app.services.identity import Caller
+    from app.services.ticket_events import accepts_for, ticket_events
+
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+    assert client.get("/tickets/events", headers=emp).status_code == 403
+
+    async def subscribe():
+        return ticket_events.subscribe(accepts_for(Caller(id=agent_id, role="agent", department="IT")))
+
+    loop = asyncio.new_event_loop()
+    try:
+        subscription = loop.run_until_complete(subscribe())
+        ticket_id = client.post("/tickets/", json={"subject": "Monitor flickers"}, headers=emp).json()["id"]
+        other_id = client.post("/tickets/", json={"subject": "Payroll question"}, headers=emp).json()["id"]
+        client.put(f"/tickets/{ticket_id}/triage", json={"priority": "low", "assigned_team": "IT"}, headers=triage)
+        client.put(f"/tickets/{other_id}/triage", json={"priority": "low", "assigned_team": "HR"}, headers=triage)
+        client.put(f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers=agent)
+        client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "cable"}, headers=agent)
+        client.put(f"/tickets/{ticket_id}/reopen", headers=emp)
+        loop.run_until_complete(asyncio.sleep(0))
+        queue = subscription.queue
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+    finally:
+        ticket_events.unsubscribe(subscription)
+        loop.close()
+
+    # New tickets have no team yet; the HR ticket is not this agent's business
+    assert [(e.event.value, e.ticket_id, e.status.value) for e in events] == [
+        ("triaged", ticket_id, "triaged"),
+        ("assigned", ticket_id, "in_progress"),
+        ("resolved", ticket_id, "resolved"),
+        ("reopened", ticket_id, "in_progress"),
+    ]
+    assert events[1].assignee_id == agent_id
+
+
+def test_change_feed_resumes_from_cursor(client, create_users_for_tickets, monkeypatch):
+    from app.routes import ticket_queries
+    monkeypatch.setattr(ticket_queries, "CHANGE_FEED_SETTLE_SECONDS", 0)
+
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent = {"X-User-ID": str(create_users_for_tickets["agent"]["id"])}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+    assert client.get("/tickets/changes", headers=emp).status_code == 403
+    empty = client.get("/tickets/changes", headers=agent)
+    assert empty.json() == [] and "X-Next-Cursor" not in empty.headers
+
+    # Bulk-created tickets share one updated_at, so pages split on the id tie-breaker
+    ids = client.post("/tickets/bulk", json=[{"subject": f"Sync {i}"} for i in range(3)], headers=emp).json()["created_ids"]
+    first = client.get("/tickets/changes", params={"limit": 2}, headers=agent)
+    assert first.status_code == 200, first.json()
+    second = client.get("/tickets/changes", params={"limit": 2, "since": first.headers["X-Next-Cursor"]}, headers=agent)
+    assert [t["id"] for t in first.json() + second.json()] == ids
+    cursor = second.headers["X-Next-Cursor"]
+
+    # Caught up: nothing new, and the cursor is handed back unchanged
+    caught_up = client.get("/tickets/changes", params={"since": cursor}, headers=agent)
+    assert caught_up.json() == [] and caught_up.headers["X-Next-Cursor"] == cursor
+
+    client.put(f"/tickets/{ids[1]}/triage", json={"priority": "low", "assigned_team": "IT"}, headers=triage)
+    changes = client.get("/tickets/changes", params={"since": cursor, "fields": "id,status"}, headers=agent).json()
+    assert changes == [{"id": ids[1], "status": "triaged"}]
+
+    # Changes younger than the settle window are held back until it passes
+    monkeypatch.setattr(ticket_queries, "CHANGE_FEED_SETTLE_SECONDS", 60)
+    assert client.get("/tickets/changes", params={"since": cursor}, headers=agent).json() == []
+
+
+def test_auto_assign_balances_team_load(client, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+    first_agent = create_users_for_tickets["agent"]["id"]
+    second_agent = client.post("/users/", json={
+        "username": "ticket_agent2", "email": "ticket_agent2@example.com", "role": "agent", "department": "IT"
+    }).json()["id"]
+    ids = client.post("/tickets/bulk", json=[{"subject": f"Auto {i}"} for i in range(4)], headers=emp).json()["created_ids"]
+
+    # critical (8) goes to the first agent; the next three (2 + 2 + 2) go to the second
+    response = client.put(f"/tickets/{ids[0]}/triage", json={
+        "priority": "critical", "assigned_team": "IT", "auto_assign": True
+    }, headers=triage)
+    assert response.status_code == 200, response.json()
+    assert response.json()["assignee_id"] == first_agent
+    response = client.put("/tickets/bulk/triage", json=[
+        {"ticket_id": ticket_id, "priority": "medium", "assigned_team": "IT", "auto_assign": True} for ticket_id in ids[1:]
+    ], headers=triage)
+    assert [o["assignee_id"] for o in response.json()] == [second_agent] * 3
+
+    # Resolving the critical ticket frees the first agent for the next auto-assignment
+    agent = {"X-User-ID": str(first_agent)}
+    client.put(f"/tickets/{ids[0]}/assign", json={"assignee_id": first_agent}, headers=agent)
+    client.put(f"/tickets/{ids[0]}/resolve", json={"resolution_notes": "done"}, headers=agent)
+    response = client.put(f"/tickets/{ids[3]}/assign", json={"auto_assign": True}, headers=agent)
+    assert response.status_code == 200, response.json()
+    assert response.json()["assignee_id"] == first_agent
+
+    # Reassigning a resolved ticket puts no load back on anyone
+    client.put(f"/tickets/{ids[0]}/assign", json={"assignee_id": second_agent}, headers=agent)
+    assert agent_load.loads("IT") == {first_agent: 2, second_agent: 4}
+
+    bad = client.put(f"/tickets/{ids[2]}/assign", json={"assignee_id": first_agent, "auto_assign": True}, headers=agent)
+    assert bad.status_code == 400
+    ticket_id = client.post("/tickets/", json={"subject": "Payroll"}, headers=emp).json()["id"]
+    response = client.put(f"/tickets/{ticket_id}/triage", json={
+        "priority": "low", "assigned_team": "Payroll", "auto_assign": True
+    }, headers=triage)
+    assert response.status_code == 400
+    assert "No agents" in response.json()["detail"]
+
+
+def test_claim_next_takes_most_urgent_unclaimed_ticket(client, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+    other_agent = client.post("/users/", json={
+        "username": "claim_agent2", "email": "claim_agent2@example.com", "role": "agent", "department": "IT"
+    }).json()["id"]
+    assert client.post("/tickets/claim-next", headers=emp).status_code == 403
+    assert client.post("/tickets/claim-next", headers=agent).status_code == 204
+
+    ids = client.post("/tickets/bulk", json=[{"subject": f"Queue {i}"} for i in range(5)], headers=emp).json()["created_ids"]
+    for ticket_id, priority, team, assignee in [
+        (ids[0], "low", "IT", None),
+        (ids[1], "high", "IT", None),
+        (ids[2], "critical", "HR", None),
+        (ids[3], "high", "IT", None),
+        (ids[4], "critical", "IT", other_agent),
+    ]:
+        client.put(f"/tickets/{ticket_id}/triage", json={
+            "priority": priority, "assigned_team": team, "assignee_id": assignee
+        }, headers=triage)
+
+    # Highest priority first, then oldest; other teams' and other agents' tickets are left alone
+    claimed = []
+    while (response := client.post("/tickets/claim-next", headers=agent)).status_code == 200:
+        assert response.json()["assignee_id"] == agent_id
+        assert response.json()["status"] == "in_progress"
+        assert response.headers["ETag"]
+        claimed.append(response.json()["id"])
+    assert response.status_code == 204
+    assert claimed == [ids[1], ids[3], ids[0]]
+    assert client.post("/tickets/claim-next", headers={"X-User-ID": str(other_agent)}).json()["id"] == ids[4]
+    assert client.get("/tickets/stats", headers=agent).json()["status"]["in_progress"] == 4
+
+
+def test_archived_tickets_stay_reachable(client, db_session, create_users_for_tickets):
+    emp = {"X-User-ID": str(create_users_for_tickets["employee"]["id"])}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage = {"X-User-ID": str(create_users_for_tickets["triage"]["id"])}
+
+    ids = client.post("/tickets/bulk", json=[{"subject": f"Old {i}"} for i in range(4)], headers=emp).json()["created_ids"]
+    for ticket_id in ids[1:3]:
+        client.put(f"/tickets/{ticket_id}/triage", json={"priority": "low", "assigned_team": "IT"}, headers=triage)
+        client.put(f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers=agent)
+        client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "done"}, headers=agent)
+        assert client.put(f"/tickets/{ticket_id}/close", headers=emp).status_code == 200
+    etag = client.get(f"/tickets/{ids[1]}", headers=emp).headers["ETag"]
+
+    from app.services.archival import archive_closed_tickets
+    assert archive_closed_tickets(db_session, days=0) == 2
+
+    # Lists leave archived tickets out unless asked; id order runs across both tables
+    assert [t["id"] for t in client.get("/tickets/", headers=agent).json()] == [ids[0], ids[3]]
+    assert [t["id"] for t in client.get("/tickets/my", headers=emp).json()] == [ids[0], ids[3]]
+    seen, cursor = [], None
+    while True:
+        params = {"include_archived": "true", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/tickets/my", params=params, headers=emp)
+        assert response.status_code == 200, response.json()
+        seen += [t["id"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == ids
+    response = client.get("/tickets/", params={"include_archived": "true", "status": "closed", "order": "desc"}, headers=agent)
+    assert [t["id"] for t in response.json()] == [ids[2], ids[1]]
+    response = client.get("/tickets/", params={"include_archived": "true", "fields": "status"}, headers=agent)
+    assert response.json() == [{"status": "new"}, {"status": "closed"}, {"status": "closed"}, {"status": "new"}]
+
+    # By id, the archive answers transparently, with the same version and access rules
+    response = client.get(f"/tickets/{ids[1]}", headers=emp)
+    assert response.status_code == 200, response.json()
+    assert response.json()["status"] == "closed"
+    assert response.headers["ETag"] == etag
+    assert client.get(f"/tickets/{ids[1]}", headers={**emp, "If-None-Match": etag}).status_code == 304
+    assert client.get(f"/tickets/{ids[1]}", params={"fields": "subject"}, headers=emp).json() == {"subject": "Old 1"}
+    other = client.post("/users/", json={"username": "archive_other", "email": "archive_other@example.com", "role": "employee"})
+    assert client.get(f"/tickets/{ids[1]}", headers={"X-User-ID": str(other.json()["id"])}).status_code == 403
+
+    # ... but they no longer change
+    for action in ("reopen", "close"):
+        response = client.put(f"/tickets/{ids[1]}/{action}", headers=emp)
+        assert response.status_code == 409
+        assert "archived" in response.json()["detail"]
+    assert client.put("/tickets/999999/close", headers=emp).status_code == 404
+
+    # Counters only count live tickets
+    stats = client.get("/tickets/stats", headers=agent).json()
+    assert stats["status"] == {"new": 2, "triaged": 0, "in_progress": 0, "resolved": 0, "closed": 0}
+    assert stats["assigned_team"] == {"none": 2}
+
+
+def test_ticket_history_records_each_transition(client, create_users_for_tickets):
+    from app.services.audit_log import audit_log
+
+    emp_id = create_users_for_tickets["employee"]["id"]
+    emp = {"X-User-ID": str(emp_id)}
+    agent_id = create_users_for_tickets["agent"]["id"]
+    agent = {"X-User-ID": str(agent_id)}
+    triage_id = create_users_for_tickets["triage"]["id"]
+    triage = {"X-User-ID": str(triage_id)}
+
+    ticket_id = client.post("/tickets/", json={"subject": "Dock not charging"}, headers=emp).json()["id"]
+    client.put(f"/tickets/{ticket_id}/triage", json={"priority": "high", "assigned_team": "IT"}, headers=triage)
+    client.put(f"/tickets/{ticket_id}/assign", json={"assignee_id": agent_id}, headers=agent)
+    client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "new dock"}, headers=agent)
+    client.put(f"/tickets/{ticket_id}/reopen", headers=emp)
+    client.put(f"/tickets/{ticket_id}/resolve", json={"resolution_notes": "firmware"}, headers=agent)
+    client.put(f"/tickets/{ticket_id}/close", headers=emp)
+    audit_log.flush()
+
+    response = client.get(f"/tickets/{ticket_id}/history", params={"limit": 4}, headers=emp)
+    assert response.status_code == 200, response.json()
+    history = response.json()
+    response = client.get(
+        f"/tickets/{ticket_id}/history", params={"cursor": response.headers["X-Next-Cursor"]}, headers=emp,
+    )
+    history += response.json()
+    assert "X-Next-Cursor" not in response.headers
+    assert [(e["event"], e["actor_id"], e["status"]) for e in history] == [
+        ("created", emp_id, "new"),
+        ("triaged", triage_id, "triaged"),
+        ("assigned", agent_id, "in_progress"),
+        ("resolved", agent_id, "resolved"),
+        ("reopened", emp_id, "in_progress"),
+        ("resolved", agent_id, "resolved"),
+        ("closed", emp_id, "closed"),
+    ]
+    assert history[2]["assignee_id"] == agent_id and history[1]["priority"] == "high"
+    assert all(e["ticket_id"] == ticket_id for e in history)
+
+    other = client.post("/users/", json={"username": "history_other", "email": "history_other@example.com", "role": "employee"})
+    assert client.get(f"/tickets/{ticket_id}/history", headers={"X-User-ID": str(other.json()["id"])}).status_code == 403
+    assert client.get("/tickets/999999/history", headers=emp).status_code == 404
+    assert client.get("/ops/audit-log", headers=agent).json()["dropped"] == 0
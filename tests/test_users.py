@@ -1,4 +1,11 @@
 import pytest
+from sqlalchemy import insert
+
+from app.models.user import User
+from app.services.identity import get_caller, identity_cache
+
+# Every request in this module must stay within its QUERY_BUDGETS entry (see conftest)
+pytestmark = pytest.mark.usefixtures("query_budget")
  
 # ---- USER TESTS ----
 def test_create_user_success(client):
@@ -98,4 +105,130 @@ def test_get_user_self_and_forbidden_other(client):
 
     # emp1 trying to fetch emp2 → forbidden
     resp_other = client.get(f"/users/{emp2_id}", headers={"X-User-ID": str(emp_id)})
-    assert resp_other.status_code == 403
\ No newline at end of file
+    assert resp_other.status_code == 403
+
+def test_get_users_paginated(client):
+    triage_id = client.post("/users/", json={
+        "username": "triage_pager",
+        "email": "triage_pager@example.com",
+        "role": "triage_officer"
+    }).json()["id"]
+    for i in range(3):
+        client.post("/users/", json={
+            "username": f"paged{i}",
+            "email": f"paged{i}@example.com",
+            "role": "employee"
+        })
+
+    first = client.get("/users/", params={"limit": 2}, headers={"X-User-ID": str(triage_id)})
+    assert first.status_code == 200
+    assert len(first.json()) == 2
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/users/", params={"limit": 2, "cursor": cursor}, headers={"X-User-ID": str(triage_id)})
+    assert second.status_code == 200
+    assert [u["username"] for u in second.json()] == ["paged1", "paged2"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_identity_cache_hits_after_first_request(client):
+    emp_id = client.post("/users/", json={
+        "username": "cached_emp",
+        "email": "cached_emp@example.com",
+        "role": "employee"
+    }).json()["id"]
+
+    agent_id = client.post("/users/", json={
+        "username": "cache_agent", "email": "cache_agent@example.com", "role": "agent", "department": "IT"
+    }).json()["id"]
+    agent = {"X-User-ID": str(agent_id)}
+
+    before = client.get("/ops/identity-cache", headers=agent).json()
+    client.get(f"/users/{emp_id}", headers={"X-User-ID": str(emp_id)})
+    client.get(f"/users/{emp_id}", headers={"X-User-ID": str(emp_id)})
+    after = client.get("/ops/identity-cache", headers=agent).json()
+
+    # The second stats read is itself a hit for the agent
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+
+
+def test_caller_lookup_returns_its_connection_to_the_pool(client, db_session):
+    emp_id = client.post("/users/", json={
+        "username": "pooled_emp",
+        "email": "pooled_emp@example.com",
+        "role": "employee"
+    }).json()["id"]
+    identity_cache.clear()
+
+    assert get_caller(emp_id, db_session).id == emp_id
+    assert not db_session.in_transaction()
+    assert get_caller(emp_id + 1000, db_session) is None
+    assert not db_session.in_transaction()
+
+
+def test_get_user_etag(client):
+    emp_id = client.post("/users/", json={
+        "username": "etag_emp",
+        "email": "etag_emp@example.com",
+        "role": "employee"
+    }).json()["id"]
+    headers = {"X-User-ID": str(emp_id)}
+
+    etag = client.get(f"/users/{emp_id}", headers=headers).headers["ETag"]
+    resp = client.get(f"/users/{emp_id}", headers={**headers, "If-None-Match": f'W/{etag}, "other"'})
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+
+    resp = client.get(f"/users/{emp_id}", headers={**headers, "If-None-Match": '"other"'})
+    assert resp.status_code == 200
+    assert resp.json()["username"] == "etag_emp"
+
+
+def test_list_rows_match_response_model(client):
+    agent_id = client.post("/users/", json={
+        "username": "json_agent",
+        "email": "json_agent@example.com",
+        "role": "agent",
+        "department": "IT"
+    }).json()["id"]
+    headers = {"X-User-ID": str(agent_id)}
+
+    listed = client.get("/users/", headers=headers).json()
+    single = client.get(f"/users/{agent_id}", headers=headers).json()
+    assert [list(row.items()) for row in listed] == [list(single.items())]
+
+
+def test_get_users_sparse_fields(client):
+    agent_id = client.post("/users/", json={
+        "username": "sparse_agent",
+        "email": "sparse_agent@example.com",
+        "role": "agent",
+        "department": "IT"
+    }).json()["id"]
+    headers = {"X-User-ID": str(agent_id)}
+
+    assert client.get("/users/", params={"fields": "role,id"}, headers=headers).json() == [{"id": agent_id, "role": "agent"}]
+    resp = client.get(f"/users/{agent_id}", params={"fields": "email"}, headers=headers)
+    assert resp.json() == {"email": "sparse_agent@example.com"}
+    assert client.get(f"/users/{agent_id}", params={"fields": "email"}, headers={
+        **headers, "If-None-Match": resp.headers["ETag"]
+    }).status_code == 304
+    assert client.get("/users/", params={"fields": "password"}, headers=headers).status_code == 400
+
+
+@pytest.mark.parametrize("rows", [1, 100, 1000])
+def test_get_users_query_count_does_not_grow_with_rows(client, db_session, rows):
+    triage_id = client.post("/users/", json={
+        "username": "triage_counted",
+        "email": "triage_counted@example.com",
+        "role": "triage_officer"
+    }).json()["id"]
+    db_session.execute(insert(User.__table__), [
+        {"username": f"bulk{i}", "email": f"bulk{i}@example.com", "role": "employee"} for i in range(rows)
+    ])
+    db_session.commit()
+
+    response = client.get("/users/", params={"limit": 200}, headers={"X-User-ID": str(triage_id)})
+    assert response.status_code == 200
+    assert len(response.json()) == min(rows + 1, 200)